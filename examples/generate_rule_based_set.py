@@ -5,6 +5,7 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import os
 from pathlib import Path
 
 from scenegen.generator import generate_scenes_for_song
@@ -33,9 +34,7 @@ def load_contexts(path: Path) -> list[SceneContext]:
     return contexts
 
 
-def main() -> None:
-    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
-
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Generate multiple rule-based scenes into a QLC+ workspace")
     parser.add_argument("workspace", help="Path to the source QLC+ workspace (.qxw)")
     parser.add_argument("--contexts", required=True, help="JSON file with a list of contexts or {'contexts': [...]}")
@@ -71,11 +70,19 @@ def main() -> None:
         default=500,
         help="Hold time per step in the primary sweep chaser (ms). Default: 500",
     )
+    return parser
+
+
+_PARSER = _build_parser()
 
-    args = parser.parse_args()
 
-    workspace_path = Path(args.workspace)
-    rig = load_rig_from_qlc(str(workspace_path))
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    args = _PARSER.parse_args()
+
+    workspace_path = args.workspace
+    rig = load_rig_from_qlc(workspace_path)
     contexts = load_contexts(Path(args.contexts))
 
     scene_set = generate_scenes_for_song(
@@ -87,17 +94,14 @@ def main() -> None:
         fixture_categories_path=args.categories,
     )
 
-    output_path = (
-        Path(args.output)
-        if args.output
-        else Path("generated") / f"{workspace_path.stem}_rule_based.qxw"
-    )
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    workspace_stem = os.path.splitext(os.path.basename(workspace_path))[0]
+    output_path = args.output or os.path.join("generated", f"{workspace_stem}_rule_based.qxw")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
     write_scenes_to_qlc(
-        str(workspace_path),
+        workspace_path,
         rig,
         scene_set,
-        output_path=str(output_path),
+        output_path=output_path,
         create_show=True,
         show_name="Generated Show",
         show_step_ms=5000,
@@ -11,10 +11,8 @@ from .qlc_io import load_rig_from_qlc, write_scenes_to_qlc
 logger = logging.getLogger(__name__)
 
 
-def main() -> None:
-    """Orchestrate generation from CLI arguments."""
-
-    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser."""
 
     parser = argparse.ArgumentParser(description="Generate QLC+ scenes with an LLM.")
     parser.add_argument("workspace", help="Path to the source QLC+ workspace (.qxw)")
@@ -35,16 +33,25 @@ def main() -> None:
         default="phi3:mini",
         help="Model name to request from the LLM endpoint.",
     )
+    return parser
 
-    args = parser.parse_args()
+
+_PARSER = _build_parser()
+
+
+def main() -> None:
+    """Orchestrate generation from CLI arguments."""
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    args = _PARSER.parse_args()
 
     rig = load_rig_from_qlc(args.workspace)
-    client = LLMClient(base_url=args.llm_base_url, model=args.llm_model)
-    scene_set = generate_scenes_for_song(rig, args.description, llm_client=client)
+    with LLMClient(base_url=args.llm_base_url, model=args.llm_model) as client:
+        scene_set = generate_scenes_for_song(rig, args.description, llm_client=client)
 
-    target_path = args.output or str(
-        Path(args.workspace).with_name(f"{Path(args.workspace).stem}_generated.qxw")
-    )
+    workspace = Path(args.workspace)
+    target_path = args.output or str(workspace.with_name(f"{workspace.stem}_generated.qxw"))
     write_scenes_to_qlc(args.workspace, rig, scene_set, output_path=target_path)
 
     logger.info("Wrote %d scenes to %s", len(scene_set.scenes), target_path)
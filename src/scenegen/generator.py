@@ -1,19 +1,39 @@
 """Scene generation pipeline driven by a language model or rule-based selector."""
 
-import json
+import asyncio
+import functools
 import logging
+import sys
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
+from . import json_compat
 from .llm_client import LLMClient
 from .prompt import build_prompt
 from .rig import Rig
-from .scene_mapper import apply_scene, load_fixture_categories, load_palettes
-from .scene_selector import SceneContext, load_scene_catalog, select_scene
+from .scene_mapper import (
+    PaletteColors,
+    apply_scene,
+    compile_palettes,
+    load_fixture_categories,
+    load_palettes,
+)
+from .scene_selector import (
+    SceneCatalog,
+    SceneContext,
+    SemanticScene,
+    load_scene_catalog,
+    select_scene,
+)
 from .schema import FixtureState, SceneSet, SceneSpec
 
 logger = logging.getLogger(__name__)
 
+_DATA_DIR = Path(__file__).parent
+_DEFAULT_CATALOG = _DATA_DIR / "scenes_basic.json"
+_DEFAULT_PALETTES = _DATA_DIR / "palettes.json"
+_DEFAULT_CATEGORIES = _DATA_DIR / "fixture_categories.json"
+
 
 def generate_scenes_for_song(
     rig: Rig,
@@ -58,28 +78,87 @@ def generate_scenes_for_song(
     except RuntimeError as exc:
         logger.warning("LLM call failed (%s); using fallback scenes", exc)
         return _fallback_scene_set(rig, song_description)
+    finally:
+        if llm_client is None:
+            client.close()
 
-    payload_text = _extract_payload_text(raw_response)
+    return _scene_set_from_response(rig, song_description, raw_response)
 
-    if not payload_text:
-        return _fallback_scene_set(rig, song_description)
 
+async def agenerate_scenes_for_songs(
+    rig: Rig,
+    song_descriptions: Sequence[str],
+    llm_client: Optional[LLMClient] = None,
+) -> List[SceneSet]:
+    """Generate one SceneSet per song description, with the LLM calls in flight concurrently."""
+
+    client = llm_client or LLMClient()
     try:
-        payload = json.loads(payload_text)
-    except json.JSONDecodeError:
+        responses = await asyncio.gather(
+            *(client.agenerate(build_prompt(rig, description)) for description in song_descriptions),
+            return_exceptions=True,
+        )
+    finally:
+        if llm_client is None:
+            client.close()
+
+    scene_sets: List[SceneSet] = []
+    for description, response in zip(song_descriptions, responses):
+        if isinstance(response, RuntimeError):
+            logger.warning("LLM call failed (%s); using fallback scenes", response)
+            scene_sets.append(_fallback_scene_set(rig, description))
+        elif isinstance(response, BaseException):
+            raise response
+        else:
+            scene_sets.append(_scene_set_from_response(rig, description, response))
+    return scene_sets
+
+
+def _scene_set_from_response(rig: Rig, song_description: str, raw_response: object) -> SceneSet:
+    """Build a SceneSet from a raw LLM response, falling back when it holds no payload."""
+
+    payload = _extract_payload(raw_response)
+    if payload is None:
         return _fallback_scene_set(rig, song_description)
 
     return _scene_set_from_dict(payload)
 
 
+_PAYLOAD_TEXT_KEYS = ("response", "text", "content")
+
+
+def _extract_payload(response: object) -> Optional[dict]:
+    """Return the decoded LLM payload, or None when it is empty or not valid JSON."""
+
+    # A dict without a text field is already the decoded payload; skip the dump/parse round trip.
+    if isinstance(response, dict) and not any(key in response for key in _PAYLOAD_TEXT_KEYS):
+        return response
+
+    payload_text = _extract_payload_text(response)
+    if not payload_text:
+        return None
+
+    try:
+        return json_compat.loads(payload_text)
+    except json_compat.JSONDecodeError:
+        return None
+
+
 def _extract_payload_text(response: object) -> str:
-    """Extract the LLM JSON payload from a variety of response shapes."""
+    """Extract the LLM JSON payload from a variety of response shapes.
+
+    Dicts only reach this point with one of the text keys; `_extract_payload`
+    returns the other ones directly.
+    """
+
+    if isinstance(response, str):
+        return response.strip()
 
     if isinstance(response, dict):
-        for key in ("response", "text", "content"):
+        for key in _PAYLOAD_TEXT_KEYS:
             if key in response:
-                return str(response[key]).strip()
-        return json.dumps(response)
+                value = response[key]
+                return value.strip() if isinstance(value, str) else str(value).strip()
 
     return str(response).strip()
 
@@ -87,29 +166,24 @@ def _extract_payload_text(response: object) -> str:
 def _scene_set_from_dict(payload: dict) -> SceneSet:
     """Build a SceneSet dataclass from a dictionary result."""
 
-    scenes = []
-    for scene_dict in payload.get("scenes", []):
-        states = []
-        for state_dict in scene_dict.get("states", []):
-            channel_values = {
-                str(name): int(value)
-                for name, value in state_dict.get("channel_values", {}).items()
-            }
-            states.append(
+    # FixtureState interns the channel names and coerces the values into DMX bytes,
+    # so the decoded payload is handed over without a separate validation pass.
+    intern = sys.intern
+    scenes = [
+        SceneSpec(
+            name=scene_dict.get("name", "Unnamed Scene"),
+            scene_type=intern(str(scene_dict.get("scene_type", "static"))),  # type: ignore[arg-type]
+            description=scene_dict.get("description"),
+            states=[
                 FixtureState(
-                    fixture_id=str(state_dict.get("fixture_id", "")),
-                    channel_values=channel_values,
+                    fixture_id=intern(str(state_dict.get("fixture_id", ""))),
+                    channel_values=state_dict.get("channel_values", {}),
                 )
-            )
-
-        scenes.append(
-            SceneSpec(
-                name=scene_dict.get("name", "Unnamed Scene"),
-                scene_type=scene_dict.get("scene_type", "static"),  # type: ignore[arg-type]
-                description=scene_dict.get("description"),
-                states=states,
-            )
+                for state_dict in scene_dict.get("states", [])
+            ],
         )
+        for scene_dict in payload.get("scenes", [])
+    ]
 
     title = payload.get("title") or "Generated Scenes"
     return SceneSet(title=title, scenes=scenes)
@@ -124,32 +198,22 @@ def _generate_from_catalog(
 ) -> Optional[SceneSet]:
     """Generate scenes from a local semantic catalog using the selector."""
 
-    base_dir = Path(__file__).parent
-    catalog_file = Path(catalog_path) if catalog_path else base_dir / "scenes_basic.json"
-    palettes_file = Path(palettes_path) if palettes_path else base_dir / "palettes.json"
+    catalog_file = Path(catalog_path) if catalog_path else _DEFAULT_CATALOG
+    palettes_file = Path(palettes_path) if palettes_path else _DEFAULT_PALETTES
     categories_file = (
-        Path(fixture_categories_path)
-        if fixture_categories_path
-        else base_dir / "fixture_categories.json"
+        Path(fixture_categories_path) if fixture_categories_path else _DEFAULT_CATEGORIES
     )
 
-    if not catalog_file.exists():
-        logger.warning("Scene catalog not found at %s", catalog_file)
-        return None
-
-    catalog = load_scene_catalog(catalog_file)
-    if not catalog:
-        logger.warning("Empty catalog; LLM fallback will be used")
+    resources = _load_resources(catalog_file, palettes_file, categories_file)
+    if resources is None:
         return None
+    catalog, palettes, categories = resources
 
     selected = select_scene(context, catalog)
     if not selected:
         logger.warning("Could not select scene; LLM fallback will be used")
         return None
 
-    palettes = load_palettes(palettes_file) if palettes_file.exists() else {}
-    categories = load_fixture_categories(categories_file) if categories_file.exists() else {}
-
     scene_spec = apply_scene(
         scene=selected,
         rig=rig,
@@ -173,28 +237,20 @@ def _generate_multiple_from_catalog(
     if not contexts:
         return None
 
-    base_dir = Path(__file__).parent
-    catalog_file = Path(catalog_path) if catalog_path else base_dir / "scenes_basic.json"
-    palettes_file = Path(palettes_path) if palettes_path else base_dir / "palettes.json"
+    catalog_file = Path(catalog_path) if catalog_path else _DEFAULT_CATALOG
+    palettes_file = Path(palettes_path) if palettes_path else _DEFAULT_PALETTES
     categories_file = (
-        Path(fixture_categories_path)
-        if fixture_categories_path
-        else base_dir / "fixture_categories.json"
+        Path(fixture_categories_path) if fixture_categories_path else _DEFAULT_CATEGORIES
     )
 
-    if not catalog_file.exists():
-        logger.warning("Scene catalog not found at %s", catalog_file)
-        return None
-
-    catalog = load_scene_catalog(catalog_file)
-    if not catalog:
-        logger.warning("Empty catalog; LLM fallback will be used")
+    resources = _load_resources(catalog_file, palettes_file, categories_file)
+    if resources is None:
         return None
+    catalog, palettes, categories = resources
 
-    palettes = load_palettes(palettes_file) if palettes_file.exists() else {}
-    categories = load_fixture_categories(categories_file) if categories_file.exists() else {}
-
-    scenes: list[SceneSpec] = []
+    # Selection is sequential because each context depends on the previous pick.
+    selected_scenes: list[SemanticScene] = []
+    candidate_cache: dict = {}
     last_palette: str | None = None
     last_scene: str | None = None
 
@@ -205,21 +261,22 @@ def _generate_multiple_from_catalog(
         if ctx.last_scene is None:
             ctx.last_scene = last_scene
 
-        selected = select_scene(ctx, catalog)
+        selected = select_scene(ctx, catalog, candidate_cache=candidate_cache)
         if not selected:
             logger.warning("No selection for context %s", ctx)
             continue
 
-        scene_spec = apply_scene(
-            scene=selected,
-            rig=rig,
-            palettes=palettes,
-            fixture_categories=categories,
-        )
-        scenes.append(scene_spec)
+        selected_scenes.append(selected)
         last_palette = selected.palette
         last_scene = selected.name
 
+    # apply_scene takes tens of microseconds per scene; shipping the rig and results to
+    # worker processes costs more than it saves, so mapping stays in-process.
+    scenes = [
+        apply_scene(scene, rig=rig, palettes=palettes, fixture_categories=categories)
+        for scene in selected_scenes
+    ]
+
     if not scenes:
         logger.warning("No scenes were generated with the provided contexts")
         return None
@@ -229,20 +286,83 @@ def _generate_multiple_from_catalog(
     return SceneSet(title=title, scenes=scenes)
 
 
+def _file_version(path: Path) -> Optional[Tuple[int, int]]:
+    """Return a file's (mtime in nanoseconds, size), or None if it is missing."""
+
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+# The cached loaders are keyed by (path, mtime, size) so edits on disk are picked up,
+# even when they land within the filesystem's timestamp granularity.
+# Their results are shared between callers and must be treated as read-only.
+@functools.lru_cache(maxsize=16)
+def _cached_catalog(path: str, version: Tuple[int, int]) -> SceneCatalog:
+    """Load a scene catalog once per file version."""
+
+    return load_scene_catalog(path)
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_palettes(path: str, version: Tuple[int, int]) -> Dict[str, Union[dict, PaletteColors]]:
+    """Load and compile palettes once per file version."""
+
+    return compile_palettes(load_palettes(path))
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_categories(path: str, version: Tuple[int, int]) -> Dict[str, List[str]]:
+    """Load fixture categories once per file version."""
+
+    return load_fixture_categories(path)
+
+
+def _load_resources(
+    catalog_file: Path,
+    palettes_file: Path,
+    categories_file: Path,
+) -> Optional[Tuple[SceneCatalog, Dict[str, Union[dict, PaletteColors]], Dict[str, List[str]]]]:
+    """Load the catalog, palettes and categories, or None if no catalog is usable.
+
+    Missing palettes or categories files fall back to empty mappings.
+    """
+
+    catalog_version = _file_version(catalog_file)
+    if catalog_version is None:
+        logger.warning("Scene catalog not found at %s", catalog_file)
+        return None
+
+    catalog = _cached_catalog(str(catalog_file), catalog_version)
+    if not catalog:
+        logger.warning("Empty catalog; LLM fallback will be used")
+        return None
+
+    palettes_version = _file_version(palettes_file)
+    palettes = (
+        _cached_palettes(str(palettes_file), palettes_version)
+        if palettes_version is not None
+        else {}
+    )
+    categories_version = _file_version(categories_file)
+    categories = (
+        _cached_categories(str(categories_file), categories_version)
+        if categories_version is not None
+        else {}
+    )
+    return catalog, palettes, categories
+
+
 def _fallback_scene_set(rig: Rig, song_description: str) -> SceneSet:
     """Return a minimal, deterministic SceneSet when the LLM is unavailable."""
 
-    states = []
-    for fixture in rig.fixtures:
-        if not fixture.channels:
-            continue
-        first_channel = fixture.channels[0]
-        states.append(
-            FixtureState(
-                fixture_id=fixture.fixture_id,
-                channel_values={first_channel.name: 255},
-            )
-        )
+    states = [
+        FixtureState(fixture_id=fixture.fixture_id, channel_values={fixture.channels[0].name: 255})
+        for fixture in rig.fixtures
+        if fixture.channels
+    ]
 
     scene = SceneSpec(
         name="LLM fallback look",
@@ -1,14 +1,23 @@
 """Lightweight client to talk to a local language model (e.g., Ollama)."""
 
-import json
+import asyncio
+import http.client
 import socket
-import urllib.error
-import urllib.request
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from . import json_compat
 
 
 class LLMClient:
-    """Encapsulates calls to the configured LLM endpoint."""
+    """Encapsulates calls to the configured LLM endpoint.
+
+    The HTTP connection is kept alive between calls; use the client as a
+    context manager (or call `close()`) to release it. Concurrent `agenerate`
+    calls each borrow a keep-alive worker client from an internal pool of at most
+    `max_workers`; further calls wait for a worker to be returned.
+    """
 
     def __init__(
         self,
@@ -16,19 +25,60 @@ class LLMClient:
         model: str = "phi3:mini",
         temperature: float = 0.2,
         force_json: bool = True,
+        timeout: float = 300,
+        max_workers: int = 4,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.temperature = temperature
         self.force_json = force_json
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._connection: Optional[http.client.HTTPConnection] = None
+        self._idle_workers: List["LLMClient"] = []
+        self._worker_slots = threading.BoundedSemaphore(max_workers)
+        self._workers_lock = threading.Lock()
+        # Bumped by close() so workers still in flight are closed when they come back.
+        self._pool_epoch = 0
+
+    def __enter__(self) -> "LLMClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections, if any.
+
+        Workers busy with an `agenerate` call are closed once that call finishes.
+        """
+
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        with self._workers_lock:
+            workers, self._idle_workers = self._idle_workers, []
+            self._pool_epoch += 1
+        for worker in workers:
+            worker.close()
+
+    async def agenerate(self, prompt: str, max_tokens: int = 1024) -> Dict[str, Any]:
+        """Async variant of `generate` so several prompts can be in flight at once."""
+
+        return await asyncio.to_thread(self._generate_on_worker, prompt, max_tokens)
 
     def generate(self, prompt: str, max_tokens: int = 1024) -> Dict[str, Any]:
-        """Send the prompt to the model and return the raw response JSON."""
+        """Send the prompt to the model and return the raw response JSON.
+
+        The response is requested as an NDJSON stream and decoded chunk by chunk
+        while the model is still generating; the returned dict has the shape of a
+        non-streamed reply, with the generated text joined under `response`.
+        """
 
         payload: Dict[str, Any] = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
+            "stream": True,
             "options": {
                 "num_predict": max_tokens,
                 "temperature": self.temperature,
@@ -37,27 +87,139 @@ class LLMClient:
         if self.force_json:
             payload["format"] = "json"
 
-        data = json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(
-            f"{self.base_url}/api/generate",
-            data=data,
-            headers={"Content-Type": "application/json"},
-            method="POST",
+        return self._post("/api/generate", json_compat.dumps_bytes(payload))
+
+    def _generate_on_worker(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        """Run `generate` on a pooled worker, waiting while all `max_workers` are busy."""
+
+        with self._worker_slots:
+            worker, epoch = self._acquire_worker()
+            try:
+                return worker.generate(prompt, max_tokens)
+            finally:
+                self._release_worker(worker, epoch)
+
+    def _acquire_worker(self) -> Tuple["LLMClient", int]:
+        """Borrow an idle worker client, creating one when none is idle.
+
+        Returns the worker and the pool epoch it was borrowed in.
+        """
+
+        with self._workers_lock:
+            epoch = self._pool_epoch
+            if self._idle_workers:
+                return self._idle_workers.pop(), epoch
+        worker = LLMClient(
+            base_url=self.base_url,
+            model=self.model,
+            temperature=self.temperature,
+            force_json=self.force_json,
+            timeout=self.timeout,
         )
+        return worker, epoch
+
+    def _release_worker(self, worker: "LLMClient", epoch: int) -> None:
+        """Return a worker to the pool, or close it if the client was closed meanwhile."""
 
+        with self._workers_lock:
+            if epoch == self._pool_epoch:
+                self._idle_workers.append(worker)
+                return
+        worker.close()
+
+    def _post(self, endpoint: str, data: bytes) -> Dict[str, Any]:
+        """POST JSON to the endpoint over the persistent connection and decode the stream."""
+
+        url = f"{urlsplit(self.base_url).path}{endpoint}"
+        reused = self._connection is not None
         try:
-            with urllib.request.urlopen(request, timeout=300) as response:
-                body = response.read().decode("utf-8")
-        except (
-            urllib.error.HTTPError,
-            urllib.error.URLError,
-            socket.timeout,
-            TimeoutError,
-            ConnectionError,
-        ) as exc:
-            raise RuntimeError(f"LLM request failed: {exc}") from exc
+            response = self._send(url, data)
+        except (http.client.HTTPException, OSError) as exc:
+            self.close()
+            if not reused or isinstance(exc, (socket.timeout, TimeoutError)):
+                raise RuntimeError(f"LLM request failed: {exc}") from exc
+
+            # The server may have dropped an idle keep-alive socket; retry once on a fresh
+            # one. Only failures before the status line are retried, so a generation
+            # that already started streaming is never run twice.
+            try:
+                response = self._send(url, data)
+            except (http.client.HTTPException, OSError) as exc:
+                self.close()
+                raise RuntimeError(f"LLM request failed: {exc}") from exc
+
+        return self._read_response(response)
+
+    def _send(self, url: str, data: bytes) -> http.client.HTTPResponse:
+        """Issue a single POST request and return the response once its status line arrived."""
+
+        connection = self._get_connection()
+        connection.request("POST", url, body=data, headers={"Content-Type": "application/json"})
+        return connection.getresponse()
+
+    def _read_response(self, response: http.client.HTTPResponse) -> Dict[str, Any]:
+        """Check the response status and decode its streamed body."""
+
+        if response.status >= 400:
+            try:
+                response.read()
+            except (http.client.HTTPException, OSError):
+                self.close()
+            else:
+                if response.will_close:
+                    self.close()
+            raise RuntimeError(f"LLM request failed: HTTP Error {response.status}: {response.reason}")
 
         try:
-            return json.loads(body)
-        except json.JSONDecodeError as exc:
-            raise RuntimeError(f"Unexpected response from LLM: {body}") from exc
+            result = _read_stream(response)
+            # Drain the chunked terminator so the connection can be reused.
+            response.read()
+        except RuntimeError:
+            self.close()
+            raise
+        except (http.client.HTTPException, OSError) as exc:
+            self.close()
+            raise RuntimeError(f"LLM response stream interrupted: {exc}") from exc
+        if response.will_close:
+            self.close()
+        return result
+
+    def _get_connection(self) -> http.client.HTTPConnection:
+        """Return the pooled connection, opening it on first use."""
+
+        if self._connection is None:
+            parts = urlsplit(self.base_url)
+            connection_cls = (
+                http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            )
+            self._connection = connection_cls(parts.hostname or "localhost", parts.port, timeout=self.timeout)
+        return self._connection
+
+
+def _read_stream(response: http.client.HTTPResponse) -> Dict[str, Any]:
+    """Decode an Ollama NDJSON stream, concatenating the `response` fragments."""
+
+    fragments: list[str] = []
+    final: Dict[str, Any]
+    for line in iter(response.readline, b""):
+        if not line.strip():
+            continue
+        try:
+            chunk = json_compat.loads(line)
+        except json_compat.JSONDecodeError as exc:
+            raise RuntimeError(
+                f"Unexpected response from LLM: {line.decode('utf-8', errors='replace')}"
+            ) from exc
+        if not isinstance(chunk, dict):
+            raise RuntimeError(f"Unexpected response from LLM: {chunk!r}")
+        if "error" in chunk:
+            raise RuntimeError(f"LLM request failed: {chunk['error']}")
+        fragments.append(chunk.get("response", ""))
+        if chunk.get("done"):
+            final = chunk
+            break
+    else:
+        raise RuntimeError("LLM response stream ended before the final chunk")
+
+    final["response"] = "".join(fragments)
+    return final
@@ -1,12 +1,17 @@
 """Prompt builder to guide the language model."""
 
+import io
+
 from .rig import Rig
 
+_FIXTURE_LINE = (
+    "- ID {fixture_id} '{name}': {manufacturer} {model} ({mode}), "
+    "universe {universe}, address {address}, channels {channel_count}"
+).format
 
-def build_prompt(rig: Rig, song_description: str) -> str:
-    """Create a text prompt describing the rig and desired output schema."""
 
-    lines = [
+_HEADER = "\n".join(
+    [
         "You are a QLC+ lighting programmer.",
         "Generate a JSON payload with static scenes suited to the song description.",
         "Output ONLY valid JSON; no prose, comments, ellipsis, or trailing text.",
@@ -17,40 +22,72 @@ def build_prompt(rig: Rig, song_description: str) -> str:
         "",
         "Rig fixtures:",
     ]
+)
+
+_EXAMPLE = "\n".join(
+    [
+        "",
+        "Example JSON:",
+        '{',
+        '  "title": "Generated scenes",',
+        '  "scenes": [',
+        '    {',
+        '      "name": "Intro wash",',
+        '      "scene_type": "static",',
+        '      "description": "Soft look for the intro",',
+        '      "states": [',
+        '        { "fixture_id": "1", "channel_values": { "ch0": 20, "ch1": 255 } }',
+        '      ]',
+        '    }',
+        '  ]',
+        '}',
+    ]
+)
 
+
+def build_prompt(rig: Rig, song_description: str) -> str:
+    """Create a text prompt describing the rig and desired output schema."""
+
+    parts = [_HEADER]
+    rig_block = _rig_block(rig)
+    if rig_block:
+        parts.append(rig_block)
+    parts.append("")
+    parts.append("Song description:")
+    parts.append(song_description.strip() or "No description provided.")
+    parts.append(_EXAMPLE)
+    return "\n".join(parts)
+
+
+def _rig_block(rig: Rig) -> str:
+    """Return the fixture description block, formatting it once per rig."""
+
+    if rig._prompt_block is not None:
+        return rig._prompt_block
+
+    buffer = io.StringIO()
     for fixture in rig.fixtures:
         shown_channels = fixture.channels[:8]
-        channel_summary = ", ".join(f"{channel.index}:{channel.name}" for channel in shown_channels)
         remaining = fixture.channel_count - len(shown_channels)
-        channel_tail = f" (+{remaining} more channels)" if remaining > 0 else ""
-        lines.append(
-            f"- ID {fixture.fixture_id} '{fixture.name}': {fixture.manufacturer} {fixture.model} ({fixture.mode}), "
-            f"universe {fixture.universe}, address {fixture.address}, channels {fixture.channel_count}"
+        buffer.write(
+            _FIXTURE_LINE(
+                fixture_id=fixture.fixture_id,
+                name=fixture.name,
+                manufacturer=fixture.manufacturer,
+                model=fixture.model,
+                mode=fixture.mode,
+                universe=fixture.universe,
+                address=fixture.address,
+                channel_count=fixture.channel_count,
+            )
         )
-        if channel_summary:
-            lines.append(f"  channels: {channel_summary}{channel_tail}")
-
-    lines.extend(
-        [
-            "",
-            "Song description:",
-            song_description.strip() or "No description provided.",
-            "",
-            "Example JSON:",
-            '{',
-            '  "title": "Generated scenes",',
-            '  "scenes": [',
-            '    {',
-            '      "name": "Intro wash",',
-            '      "scene_type": "static",',
-            '      "description": "Soft look for the intro",',
-            '      "states": [',
-            '        { "fixture_id": "1", "channel_values": { "ch0": 20, "ch1": 255 } }',
-            '      ]',
-            '    }',
-            '  ]',
-            '}',
-        ]
-    )
-
-    return "\n".join(lines)
+        if shown_channels:
+            buffer.write("\n  channels: ")
+            buffer.write(", ".join(f"{channel.index}:{channel.name}" for channel in shown_channels))
+            if remaining > 0:
+                buffer.write(f" (+{remaining} more channels)")
+        buffer.write("\n")
+
+    # Drop the trailing newline; build_prompt joins blocks with newlines.
+    rig._prompt_block = buffer.getvalue()[:-1]
+    return rig._prompt_block
@@ -1,62 +1,163 @@
 """Utility helpers to read and write QLC+ workspace files."""
 
-import xml.etree.ElementTree as ET
+import functools
+import mmap
+import os
+import re
+from dataclasses import dataclass
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Iterable, Optional
+from typing import Dict, List, Optional, Tuple, Union
+from xml.parsers import expat
+
+try:  # Optional C-backed parser for rig loading; the stdlib API covers every call used here.
+    from lxml import etree as ET  # type: ignore[import-untyped]
+
+    HAS_LXML = True
+except ImportError:  # pragma: no cover - depends on the environment
+    import xml.etree.ElementTree as ET  # type: ignore[no-redef]
+
+    HAS_LXML = False
 
 from .rig import ChannelDef, FixtureDef, Rig
-from .schema import FixtureState, SceneSet, SceneSpec
+from .schema import SLOTS, FixtureState, SceneSet, SceneSpec
+
+StrPath = Union[str, "os.PathLike[str]"]
 
 QLC_NAMESPACE = "http://www.qlcplus.org/Workspace"
 NS = {"qlc": QLC_NAMESPACE}
 
-# Register the default namespace so ElementTree does not add prefixes on write.
-ET.register_namespace("", QLC_NAMESPACE)
+# Clark-notation tag names for the elements read from a workspace, built once.
+_NS_BRACE = f"{{{QLC_NAMESPACE}}}"
+_TAG_ADDRESS = _NS_BRACE + "Address"
+_TAG_CHANNELS = _NS_BRACE + "Channels"
+_TAG_ENGINE = _NS_BRACE + "Engine"
+_TAG_FIXTURE = _NS_BRACE + "Fixture"
+_TAG_ID = _NS_BRACE + "ID"
+_TAG_MANUFACTURER = _NS_BRACE + "Manufacturer"
+_TAG_MODE = _NS_BRACE + "Mode"
+_TAG_MODEL = _NS_BRACE + "Model"
+_TAG_NAME = _NS_BRACE + "Name"
+_TAG_UNIVERSE = _NS_BRACE + "Universe"
 
+# expat reports namespaced names as "<namespace>}<local name>".
+_EXPAT_ENGINE = f"{QLC_NAMESPACE}}}Engine"
+_EXPAT_FUNCTION = f"{QLC_NAMESPACE}}}Function"
+_EXPAT_MONITOR = f"{QLC_NAMESPACE}}}Monitor"
 
-def load_rig_from_qlc(path: str) -> Rig:
-    """Load a rig definition from a QLC+ workspace (.qxw)."""
+# Channel names given as "3", "ch3", "chan3" or "channel3".
+_NUMERIC_CHANNEL_RE = re.compile(r"(?:ch|chan|channel)?(\d+)")
 
-    def _text(parent: ET.Element, tag: str, default: str = "") -> str:
-        elem = parent.find(f"qlc:{tag}", NS)
-        return elem.text.strip() if elem is not None and elem.text else default
+# Raw (possibly prefixed) element name following a "<".
+_TAG_NAME_RE = re.compile(rb"[^\s/>]+")
 
-    tree = ET.parse(path)
-    root = tree.getroot()
-    engine = root.find("qlc:Engine", NS)
-    if engine is None:
-        raise ValueError("QLC+ workspace missing <Engine> section")
 
-    fixtures: list[FixtureDef] = []
-    for fixture_el in engine.findall("qlc:Fixture", NS):
-        channel_count = int(_text(fixture_el, "Channels", "0"))
-        channels = [
-            ChannelDef(index=i, name=f"ch{i}", channel_type="generic")
-            for i in range(channel_count)
-        ]
+# Same escapes ElementTree applies to attribute values.
+_ATTR_ESCAPES = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+)
 
-        fixtures.append(
-            FixtureDef(
-                fixture_id=_text(fixture_el, "ID"),
-                name=_text(fixture_el, "Name"),
-                manufacturer=_text(fixture_el, "Manufacturer"),
-                model=_text(fixture_el, "Model"),
-                mode=_text(fixture_el, "Mode"),
-                universe=int(_text(fixture_el, "Universe", "0")),
-                address=int(_text(fixture_el, "Address", "0")),
-                channels=channels,
-            )
-        )
+
+class _EngineScanDone(Exception):
+    """Raised from expat handlers to stop scanning once </Engine> is reached."""
+
+
+@dataclass(frozen=True, **SLOTS)
+class _EngineLayout:
+    """Where new functions go in a workspace's <Engine> and how they are formatted."""
+
+    max_id: int
+    insert_at: int
+    unit: str = ""
+    newline: str = ""
+    # "q:" when the workspace binds the QLC+ namespace to a prefix.
+    prefix: str = ""
+    # Raw tag name of a self-closing <Engine/>, which must be opened around the functions.
+    self_closing_tag: Optional[bytes] = None
+
+
+def load_rig_from_qlc(path: StrPath) -> Rig:
+    """Load a rig definition from a QLC+ workspace (.qxw).
+
+    The workspace is parsed incrementally: only the <Fixture> children of <Engine>
+    are materialized, and parsing stops once the fixture block has been read.
+    """
+
+    fixtures: list[FixtureDef] = []
+    engine_seen = False
+    depth = 0
+    with open(path, "rb") as fh:
+        for event, elem in _iterparse(fh, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 2 and elem.tag == _TAG_ENGINE:
+                    engine_seen = True
+                elif depth == 3 and engine_seen and fixtures and elem.tag != _TAG_FIXTURE:
+                    # QLC+ writes all fixtures in one block; the rest of the file is not needed.
+                    break
+                continue
+
+            depth -= 1
+            if depth == 1 and elem.tag == _TAG_ENGINE:
+                break
+            if depth == 2 and engine_seen:
+                if elem.tag == _TAG_FIXTURE:
+                    fixtures.append(_fixture_from_element(elem))
+                # Engine children are not needed once read; drop their subtrees.
+                elem.clear()
+
+    if not engine_seen:
+        raise ValueError("QLC+ workspace missing <Engine> section")
 
     rig_name = Path(path).stem
     return Rig(name=rig_name, fixtures=fixtures)
 
 
+def _iterparse(source, events: tuple):
+    """Iterate parse events; with lxml, entities are not resolved and DTDs not fetched."""
+
+    if HAS_LXML:
+        return ET.iterparse(source, events=events, resolve_entities=False, no_network=True)
+    return ET.iterparse(source, events=events)
+
+
+def _text(fields: Dict[str, Optional[str]], tag: str, default: str = "") -> str:
+    """Return the stripped text of a child field, or `default` when missing or empty."""
+
+    text = fields.get(tag)
+    return text.strip() if text else default
+
+
+def _fixture_from_element(fixture_el: ET.Element) -> FixtureDef:
+    """Build a FixtureDef from a <Fixture> element."""
+
+    # One pass over the children instead of a find() per field; iterating in reverse
+    # keeps the first occurrence of a repeated tag, as find() would.
+    fields = {child.tag: child.text for child in reversed(fixture_el)}
+
+    channel_count = int(_text(fields, _TAG_CHANNELS, "0"))
+    channels = [
+        ChannelDef(index=i, name=f"ch{i}", channel_type="generic")
+        for i in range(channel_count)
+    ]
+
+    return FixtureDef(
+        fixture_id=_text(fields, _TAG_ID),
+        name=_text(fields, _TAG_NAME),
+        manufacturer=_text(fields, _TAG_MANUFACTURER),
+        model=_text(fields, _TAG_MODEL),
+        mode=_text(fields, _TAG_MODE),
+        universe=int(_text(fields, _TAG_UNIVERSE, "0")),
+        address=int(_text(fields, _TAG_ADDRESS, "0")),
+        channels=channels,
+    )
+
+
 def write_scenes_to_qlc(
-    path: str,
+    path: StrPath,
     rig: Rig,
     scenes: SceneSet,
-    output_path: Optional[str] = None,
+    output_path: Optional[StrPath] = None,
     create_show: bool = False,
     show_name: str = "Generated Show",
     show_step_ms: int = 5000,
@@ -71,331 +172,411 @@ def write_scenes_to_qlc(
     """Append generated scenes to a QLC+ workspace.
 
     The original file is left untouched; by default the function writes to
-    `<stem>_generated.qxw` unless `output_path` is provided.
+    `<stem>_generated.qxw` unless `output_path` is provided. Existing content is
+    copied byte for byte and the new functions are spliced in before <Monitor>
+    (or </Engine>), so the workspace is never loaded as a full tree.
     """
 
-    doctype = _extract_doctype(path)
-
-    tree = ET.parse(path)
-    root = tree.getroot()
-    engine = root.find("qlc:Engine", NS)
-    if engine is None:
-        raise ValueError("QLC+ workspace missing <Engine> section")
-
-    existing_ids = {
-        int(func.attrib["ID"])
-        for func in engine.findall("qlc:Function", NS)
-        if "ID" in func.attrib
-    }
-    next_id = max(existing_ids) + 1 if existing_ids else 0
+    source = Path(path)
+    layout = _scan_engine(source)
+    next_id = layout.max_id + 1
 
-    fixture_index: Dict[str, FixtureDef] = {fx.fixture_id: fx for fx in rig.fixtures}
+    channel_maps = _rig_channel_maps(rig)
 
-    # Insert new scenes before <Monitor> if present to keep expected element order.
-    monitor_idx: Optional[int] = None
-    for idx, child in enumerate(list(engine)):
-        if child.tag == f"{{{QLC_NAMESPACE}}}Monitor":
-            monitor_idx = idx
-            break
+    # New functions are serialized straight to XML text and spliced into the original
+    # bytes; the rest of the workspace is copied through untouched.
+    functions: List[str] = []
 
     new_scene_ids: list[int] = []
     for scene in scenes.scenes:
-        _append_scene(engine, fixture_index, scene, next_id, insert_at=monitor_idx)
+        _append_scene(functions, layout, channel_maps, scene, next_id)
         new_scene_ids.append(next_id)
         next_id += 1
-        if monitor_idx is not None:
-            monitor_idx += 1
 
     if create_show and new_scene_ids:
         _append_show(
-            engine,
+            functions,
+            layout,
             show_id=next_id,
             scene_ids=new_scene_ids,
             show_name=show_name,
             step_ms=show_step_ms,
-            insert_at=monitor_idx,
         )
         next_id += 1
-        if monitor_idx is not None:
-            monitor_idx += 1
 
     # Optional: create a flash chaser (white on/off) and a show to run it for X ms.
     if create_flash_chaser:
         flash_on, flash_off = _build_flash_scenes(rig)
         flash_on_id, flash_off_id = next_id, next_id + 1
-        _append_scene(engine, fixture_index, flash_on, flash_on_id, insert_at=monitor_idx)
+        _append_scene(functions, layout, channel_maps, flash_on, flash_on_id)
         next_id += 1
-        if monitor_idx is not None:
-            monitor_idx += 1
-        _append_scene(engine, fixture_index, flash_off, flash_off_id, insert_at=monitor_idx)
+        _append_scene(functions, layout, channel_maps, flash_off, flash_off_id)
         next_id += 1
-        if monitor_idx is not None:
-            monitor_idx += 1
 
         chaser_id = next_id
         _append_chaser(
-            engine,
+            functions,
+            layout,
             chaser_id=chaser_id,
             step_scene_ids=[flash_on_id, flash_off_id],
             chaser_name=flash_chaser_name,
             step_ms=flash_step_ms,
-            insert_at=monitor_idx,
         )
         next_id += 1
-        if monitor_idx is not None:
-            monitor_idx += 1
 
         if create_show:
             _append_show(
-                engine,
+                functions,
+                layout,
                 show_id=next_id,
                 scene_ids=[chaser_id],
                 show_name=f"{flash_chaser_name} Show",
                 step_ms=flash_total_ms,
                 is_chaser=True,
-                insert_at=monitor_idx,
             )
             next_id += 1
-            if monitor_idx is not None:
-                monitor_idx += 1
 
     # Optional: create a primary sweep chaser (wash blue stepping through fixtures).
     if create_primary_sweep:
         sweep_scenes = _build_primary_sweep_scenes(rig)
         sweep_scene_ids: list[int] = []
         for scene in sweep_scenes:
-            _append_scene(engine, fixture_index, scene, next_id, insert_at=monitor_idx)
+            _append_scene(functions, layout, channel_maps, scene, next_id)
             sweep_scene_ids.append(next_id)
             next_id += 1
-            if monitor_idx is not None:
-                monitor_idx += 1
 
         chaser_id = next_id
         _append_chaser(
-            engine,
+            functions,
+            layout,
             chaser_id=chaser_id,
             step_scene_ids=sweep_scene_ids,
             chaser_name=primary_sweep_name,
             step_ms=primary_sweep_step_ms,
-            insert_at=monitor_idx,
         )
         next_id += 1
-        if monitor_idx is not None:
-            monitor_idx += 1
 
         if create_show:
             _append_show(
-                engine,
+                functions,
+                layout,
                 show_id=next_id,
                 scene_ids=[chaser_id],
                 show_name=f"{primary_sweep_name} Show",
                 step_ms=primary_sweep_step_ms * len(sweep_scene_ids),
                 is_chaser=True,
-                insert_at=monitor_idx,
             )
             next_id += 1
-            if monitor_idx is not None:
-                monitor_idx += 1
 
     target = (
         Path(output_path)
         if output_path
-        else Path(path).with_name(f"{Path(path).stem}_generated.qxw")
+        else source.with_name(f"{source.stem}_generated.qxw")
     )
 
-    _indent(root)
+    payload = "".join(functions).encode("utf-8")
+    insert_at = resume_at = layout.insert_at
+    if layout.self_closing_tag is not None:
+        # Open the self-closing <Engine/> so the new functions become its children.
+        payload = b"".join(
+            [
+                b">",
+                layout.newline.encode("ascii"),
+                payload,
+                layout.unit.encode("ascii"),
+                b"</" + layout.self_closing_tag + b">",
+            ]
+        )
+        resume_at = insert_at + len(b"/>")
+
+    _splice_functions(source, target, payload, insert_at, resume_at)
+
+
+def _scan_engine(source: Path) -> _EngineLayout:
+    """Scan the <Engine> section without building a tree.
+
+    Finds the highest existing function ID (-1 if none) and the byte offset where new
+    functions belong: before <Monitor> if present, else before </Engine>, or at the
+    "/>" of a self-closing <Engine/>. New functions are indented with the whitespace
+    <Engine> is indented with and end their lines like the line before it; when the
+    file is not indented line by line they are written without line breaks. They
+    reuse the namespace prefix of the <Engine> tag, if any.
+    """
+
+    max_id = -1
+    offsets: Dict[str, int] = {}
+    depth = 0
+    parser = expat.ParserCreate(namespace_separator="}")
+
+    def start(name: str, attrs: Dict[str, str]) -> None:
+        nonlocal depth, max_id
+        depth += 1
+        if depth == 2 and name == _EXPAT_ENGINE:
+            offsets.setdefault("engine", parser.CurrentByteIndex)
+        elif depth == 3 and "engine" in offsets:
+            if name == _EXPAT_FUNCTION:
+                function_id = attrs.get("ID")
+                if function_id is not None and int(function_id) > max_id:
+                    max_id = int(function_id)
+            elif name == _EXPAT_MONITOR:
+                # New functions must land before <Monitor> to keep the expected order.
+                offsets.setdefault("insert", parser.CurrentByteIndex)
+
+    def end(name: str) -> None:
+        nonlocal depth
+        depth -= 1
+        if depth == 1 and name == _EXPAT_ENGINE:
+            offsets["close"] = parser.CurrentByteIndex
+            raise _EngineScanDone
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    with open(source, "rb") as fh:
+        try:
+            parser.ParseFile(fh)
+        except _EngineScanDone:
+            pass
+
+        if "close" not in offsets:
+            raise ValueError("QLC+ workspace missing <Engine> section")
+
+        engine_at, close_at = offsets["engine"], offsets["close"]
+        insert_at = offsets.get("insert", close_at)
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            tag_match = _TAG_NAME_RE.match(mapped, engine_at + 1)
+            if tag_match is None:  # pragma: no cover - expat reported a start tag here
+                raise ValueError("QLC+ workspace has a malformed <Engine> tag")
+            engine_tag = tag_match.group()
+            prefix = engine_tag.rpartition(b":")[0]
+            ns = f"{prefix.decode('utf-8')}:" if prefix else ""
+
+            line_start = mapped.rfind(b"\n", 0, engine_at) + 1
+            unit = mapped[line_start:engine_at]
+            if unit.strip():
+                unit = b""
+            newline = "\r\n" if mapped[line_start - 2 : line_start] == b"\r\n" else "\n"
+
+            # expat reports the end of <Engine/> right after its "/>", but the end of
+            # <Engine>...</Engine> at the start of the end tag.
+            end_tag = b"</" + engine_tag
+            after_end_tag = mapped[close_at + len(end_tag) : close_at + len(end_tag) + 1]
+            has_end_tag = mapped[close_at : close_at + len(end_tag)] == end_tag and (
+                after_end_tag == b">" or after_end_tag.isspace()
+            )
+            if mapped[close_at - 2 : close_at] == b"/>" and not has_end_tag:
+                return _EngineLayout(
+                    max_id,
+                    close_at - len(b"/>"),
+                    unit.decode("ascii"),
+                    newline if unit else "",
+                    ns,
+                    engine_tag,
+                )
+
+            # Insert whole lines when both <Engine> and the insertion point start an
+            # indented line.
+            insert_line = mapped.rfind(b"\n", 0, insert_at) + 1
+            if unit and not mapped[insert_line:insert_at].strip():
+                return _EngineLayout(max_id, insert_line, unit.decode("ascii"), newline, ns)
+
+    return _EngineLayout(max_id, insert_at, prefix=ns)
+
+
+def _splice_functions(
+    source: Path,
+    target: Path,
+    functions: bytes,
+    insert_at: int,
+    resume_at: Optional[int] = None,
+) -> None:
+    """Copy `source` to `target`, inserting the serialized `functions` at `insert_at`.
 
-    # ElementTree discards the DOCTYPE; reinsert it manually.
-    xml_body = ET.tostring(root, encoding="unicode")
-    with open(target, "w", encoding="UTF-8") as fh:
-        fh.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-        if doctype:
-            fh.write(f"{doctype}\n")
-        fh.write(xml_body)
+    Source bytes between `insert_at` and `resume_at` (if given) are replaced.
+    """
+
+    if resume_at is None:
+        resume_at = insert_at
+
+    view: Optional[memoryview] = None
+    head: Union[bytes, memoryview]
+    tail: Union[bytes, memoryview]
+    with open(source, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if target.exists() and os.path.samefile(source, target):
+            # Writing in place would truncate the mapped source; copy it out first.
+            head, tail = mapped[:insert_at], mapped[resume_at:]
+        else:
+            view = memoryview(mapped)
+            head, tail = view[:insert_at], view[resume_at:]
+        try:
+            with open(target, "wb") as out:
+                out.write(head)
+                out.write(functions)
+                out.write(tail)
+        finally:
+            # Views must be released before the mapping can close.
+            for part in (head, tail):
+                if isinstance(part, memoryview):
+                    part.release()
+            if view is not None:
+                view.release()
+
+
+def _escape_attr(value: str) -> str:
+    """Escape a value for use inside a double-quoted XML attribute."""
+
+    return value.translate(_ATTR_ESCAPES)
 
 
 def _append_scene(
-    engine: ET.Element,
-    fixture_index: Dict[str, FixtureDef],
+    functions: List[str],
+    layout: _EngineLayout,
+    channel_maps: Dict[str, Dict[str, int]],
     scene: SceneSpec,
     scene_id: int,
-    insert_at: Optional[int] = None,
 ) -> None:
-    """Create a <Function Type="Scene"> node for the provided SceneSpec."""
+    """Serialize a <Function Type="Scene"> for the provided SceneSpec."""
 
-    func_el = ET.Element(
-        f"{{{QLC_NAMESPACE}}}Function",
-        {"ID": str(scene_id), "Type": "Scene", "Name": scene.name},
-    )
-    ET.SubElement(
-        func_el,
-        f"{{{QLC_NAMESPACE}}}Speed",
-        {"FadeIn": "0", "FadeOut": "0", "Duration": "0"},
+    unit, nl, ns = layout.unit, layout.newline, layout.prefix
+    indent, child = unit * 2, unit * 3
+    parts = [
+        f'{indent}<{ns}Function ID="{scene_id}" Type="Scene" Name="{_escape_attr(scene.name)}">{nl}',
+        f'{child}<{ns}Speed FadeIn="0" FadeOut="0" Duration="0"/>{nl}',
+    ]
+    parts.extend(
+        [
+            f"{child}{_fixture_val_xml(channel_maps, fixture_state, ns)}{nl}"
+            for fixture_state in scene.states
+            if fixture_state.channel_names
+        ]
     )
-
-    for fixture_state in scene.states:
-        _append_fixture_channels(func_el, fixture_index, fixture_state)
-
-    if insert_at is None:
-        engine.append(func_el)
-    else:
-        engine.insert(insert_at, func_el)
+    parts.append(f"{indent}</{ns}Function>{nl}")
+    functions.append("".join(parts))
 
 
 def _append_show(
-    engine: ET.Element,
+    functions: List[str],
+    layout: _EngineLayout,
     show_id: int,
     scene_ids: list[int],
     show_name: str,
     step_ms: int,
-    insert_at: Optional[int] = None,
     is_chaser: bool = False,
 ) -> None:
-    """Create a <Function Type='Show'> scheduling provided scenes/chaser sequentially."""
+    """Serialize a <Function Type='Show'> scheduling provided scenes/chaser sequentially."""
 
-    func_el = ET.Element(
-        f"{{{QLC_NAMESPACE}}}Function",
-        {"ID": str(show_id), "Type": "Show", "Name": show_name},
-    )
-    ET.SubElement(
-        func_el,
-        f"{{{QLC_NAMESPACE}}}TimeDivision",
-        {"Type": "Time", "BPM": "120"},
-    )
-    track = ET.SubElement(
-        func_el,
-        f"{{{QLC_NAMESPACE}}}Track",
-        {"ID": "0", "Name": show_name, "SceneID": str(scene_ids[0]), "isMute": "0"},
-    )
+    unit, nl, ns = layout.unit, layout.newline, layout.prefix
+    indent, child, leaf = unit * 2, unit * 3, unit * 4
+    name = _escape_attr(show_name)
     color = "#55aa00"
-    for idx, scene_id in enumerate(scene_ids):
-        start = idx * step_ms
-        duration = "0" if is_chaser else str(step_ms)
-        ET.SubElement(
-            track,
-            f"{{{QLC_NAMESPACE}}}ShowFunction",
-            {
-                "ID": str(scene_id),
-                "StartTime": str(start),
-                "Duration": duration,
-                "Color": color,
-            },
-        )
-
-    if insert_at is None:
-        engine.append(func_el)
-    else:
-        engine.insert(insert_at, func_el)
+    duration = "0" if is_chaser else str(step_ms)
+    parts = [
+        f'{indent}<{ns}Function ID="{show_id}" Type="Show" Name="{name}">{nl}',
+        f'{child}<{ns}TimeDivision Type="Time" BPM="120"/>{nl}',
+        f'{child}<{ns}Track ID="0" Name="{name}" SceneID="{scene_ids[0]}" isMute="0">{nl}',
+    ]
+    parts.extend(
+        [
+            f'{leaf}<{ns}ShowFunction ID="{scene_id}" StartTime="{idx * step_ms}"'
+            f' Duration="{duration}" Color="{color}"/>{nl}'
+            for idx, scene_id in enumerate(scene_ids)
+        ]
+    )
+    parts.append(f"{child}</{ns}Track>{nl}{indent}</{ns}Function>{nl}")
+    functions.append("".join(parts))
 
 
-def _append_fixture_channels(
-    scene_el: ET.Element,
-    fixture_index: Dict[str, FixtureDef],
+def _fixture_val_xml(
+    channel_maps: Dict[str, Dict[str, int]],
     fixture_state: FixtureState,
-) -> None:
-    """Attach channel values to a Scene using <FixtureVal> (QLC+ compressed format)."""
-
-    fixture = fixture_index.get(fixture_state.fixture_id)
-    channel_items: list[tuple[int, int]] = []
-
-    for fallback_idx, (channel_name, raw_value) in enumerate(
-        fixture_state.channel_values.items()
-    ):
-        channel_idx = _resolve_channel_index(fixture, channel_name, fallback_idx)
-        value = max(0, min(255, int(raw_value)))
-        channel_items.append((channel_idx, value))
-
-    if not channel_items:
-        return
-
-    # Sort by index and compress as "idx,val,idx,val,..."
-    channel_items.sort(key=lambda t: t[0])
-    flattened = []
-    for idx, val in channel_items:
-        flattened.append(str(idx))
-        flattened.append(str(val))
-    payload = ",".join(flattened)
-
-    fixture_val_el = ET.SubElement(
-        scene_el,
-        f"{{{QLC_NAMESPACE}}}FixtureVal",
-        {"ID": str(fixture_state.fixture_id)},
-    )
-    fixture_val_el.text = payload
+    ns: str = "",
+) -> str:
+    """Serialize the <FixtureVal> (QLC+ compressed format) for a fixture state with channels.
+
+    `ns` is the namespace prefix (with its colon) to qualify the element with, if any.
+    """
+
+    channel_map = channel_maps.get(fixture_state.fixture_id)
+    resolve = _resolve_channel_index
+
+    # FixtureState already stores clamped DMX bytes alongside the channel names.
+    channel_items = [
+        (resolve(channel_map, channel_name, fallback_idx), value)
+        for fallback_idx, (channel_name, value) in enumerate(
+            zip(fixture_state.channel_names, fixture_state.values)
+        )
+    ]
+
+    # Sort by index (stable for duplicates) and compress as "idx,val,idx,val,..."
+    channel_items.sort(key=itemgetter(0))
+    payload = ",".join([f"{idx},{val}" for idx, val in channel_items])
+    return f'<{ns}FixtureVal ID="{_escape_attr(str(fixture_state.fixture_id))}">{payload}</{ns}FixtureVal>'
 
 
 def _append_chaser(
-    engine: ET.Element,
+    functions: List[str],
+    layout: _EngineLayout,
     chaser_id: int,
     step_scene_ids: list[int],
     chaser_name: str,
     step_ms: int,
-    insert_at: Optional[int] = None,
 ) -> None:
-    """Create a <Function Type='Chaser'> alternating provided scene IDs."""
-
-    func_el = ET.Element(
-        f"{{{QLC_NAMESPACE}}}Function",
-        {"ID": str(chaser_id), "Type": "Chaser", "Name": chaser_name},
-    )
-    ET.SubElement(
-        func_el,
-        f"{{{QLC_NAMESPACE}}}Speed",
-        {"FadeIn": "0", "FadeOut": "0", "Duration": str(step_ms)},
-    )
-    ET.SubElement(func_el, f"{{{QLC_NAMESPACE}}}Direction").text = "Forward"
-    ET.SubElement(func_el, f"{{{QLC_NAMESPACE}}}RunOrder").text = "Loop"
-    ET.SubElement(
-        func_el,
-        f"{{{QLC_NAMESPACE}}}SpeedModes",
-        {"FadeIn": "Default", "FadeOut": "Default", "Duration": "Common"},
+    """Serialize a <Function Type='Chaser'> alternating provided scene IDs."""
+
+    unit, nl, ns = layout.unit, layout.newline, layout.prefix
+    indent, child = unit * 2, unit * 3
+    parts = [
+        f'{indent}<{ns}Function ID="{chaser_id}" Type="Chaser" Name="{_escape_attr(chaser_name)}">{nl}',
+        f'{child}<{ns}Speed FadeIn="0" FadeOut="0" Duration="{step_ms}"/>{nl}',
+        f"{child}<{ns}Direction>Forward</{ns}Direction>{nl}",
+        f"{child}<{ns}RunOrder>Loop</{ns}RunOrder>{nl}",
+        f'{child}<{ns}SpeedModes FadeIn="Default" FadeOut="Default" Duration="Common"/>{nl}',
+    ]
+    parts.extend(
+        [
+            f'{child}<{ns}Step Number="{idx}" FadeIn="0" Hold="{step_ms}" FadeOut="0">{scene_id}</{ns}Step>{nl}'
+            for idx, scene_id in enumerate(step_scene_ids)
+        ]
     )
-    for idx, scene_id in enumerate(step_scene_ids):
-        ET.SubElement(
-            func_el,
-            f"{{{QLC_NAMESPACE}}}Step",
-            {"Number": str(idx), "FadeIn": "0", "Hold": str(step_ms), "FadeOut": "0"},
-        ).text = str(scene_id)
+    parts.append(f"{indent}</{ns}Function>{nl}")
+    functions.append("".join(parts))
 
-    if insert_at is None:
-        engine.append(func_el)
-    else:
-        engine.insert(insert_at, func_el)
 
+def _rig_channel_maps(rig: Rig) -> Dict[str, Dict[str, int]]:
+    """Return the channel index maps of every fixture, building them once per rig."""
 
-def _resolve_channel_index(
-    fixture: Optional[FixtureDef], channel_name: str, fallback: int
-) -> int:
-    """Resolve channel names like '0', 'ch1' or fixture channel names to an index."""
+    if rig._channel_maps is None:
+        rig._channel_maps = {fx.fixture_id: _channel_index_map(fx) for fx in rig.fixtures}
+    return rig._channel_maps
 
-    lowered = channel_name.lower()
-    if lowered.isdigit():
-        return int(lowered)
 
-    for prefix in ("ch", "channel", "chan"):
-        if lowered.startswith(prefix) and lowered[len(prefix) :].isdigit():
-            return int(lowered[len(prefix) :])
+def _channel_index_map(fixture: FixtureDef) -> Dict[str, int]:
+    """Map lower-cased channel names of a fixture to their index (first match wins)."""
 
-    if fixture:
-        for channel in fixture.channels:
-            if channel.name.lower() == lowered:
-                return channel.index
+    return {channel.name.lower(): channel.index for channel in reversed(fixture.channels)}
 
-    return fallback
 
+@functools.lru_cache(maxsize=1024)
+def _parse_channel_name(channel_name: str) -> Tuple[str, Optional[int]]:
+    """Lower-case a channel name and extract its numeric index, if it has one."""
 
-def _extract_doctype(path: str) -> Optional[str]:
-    """Attempt to recover the DOCTYPE line from the original file, if present."""
+    lowered = channel_name.lower()
+    numeric = _NUMERIC_CHANNEL_RE.fullmatch(lowered)
+    return lowered, int(numeric.group(1)) if numeric else None
 
-    try:
-        with open(path, "r", encoding="utf-8") as fh:
-            for line in fh:
-                stripped = line.strip()
-                if stripped.startswith("<!DOCTYPE"):
-                    return stripped
-    except OSError:
-        return None
-    return None
+
+def _resolve_channel_index(
+    channel_map: Optional[Dict[str, int]], channel_name: str, fallback: int
+) -> int:
+    """Resolve channel names like '0', 'ch1' or fixture channel names to an index."""
+
+    lowered, numeric = _parse_channel_name(channel_name)
+    if numeric is not None:
+        return numeric
+
+    if channel_map:
+        return channel_map.get(lowered, fallback)
+
+    return fallback
 
 
 def _build_flash_scenes(rig: Rig) -> tuple[SceneSpec, SceneSpec]:
@@ -405,27 +586,11 @@ def _build_flash_scenes(rig: Rig) -> tuple[SceneSpec, SceneSpec]:
     states_off: list[FixtureState] = []
     for fixture in rig.fixtures:
         # ON state: white at full on channel layout.
-        channel_values_on: dict[str, int] = {}
-        if fixture.channel_count >= 5:
-            channel_values_on["ch0"] = 255
-            channel_values_on["ch1"] = 255
-            channel_values_on["ch2"] = 255
-            channel_values_on["ch3"] = 255
-            channel_values_on["ch4"] = 255
-        elif fixture.channel_count == 4:
-            channel_values_on["ch0"] = 255
-            channel_values_on["ch1"] = 255
-            channel_values_on["ch2"] = 255
-            channel_values_on["ch3"] = 255
-        elif fixture.channel_count >= 3:
-            channel_values_on["ch0"] = 255
-            channel_values_on["ch1"] = 255
-            channel_values_on["ch2"] = 255
-        elif fixture.channel_count >= 1:
-            channel_values_on["ch0"] = 255
-
         states_on.append(
-            FixtureState(fixture_id=fixture.fixture_id, channel_values=channel_values_on)
+            FixtureState(
+                fixture_id=fixture.fixture_id,
+                channel_values=dict(_uniform_layout(_channel_tier(fixture.channel_count), 255)),
+            )
         )
 
         states_off.append(
@@ -447,35 +612,29 @@ def _build_primary_sweep_scenes(rig: Rig) -> list[SceneSpec]:
     ]
     sweep_targets = [fx for fx in wash_fixtures if fx is not bar_fixture]
 
-    scenes: list[SceneSpec] = []
-    for target in sweep_targets or wash_fixtures:
-        states: list[FixtureState] = []
-
-        # Bar LED always blue dim.
-        if bar_fixture:
-            states.append(
-                FixtureState(
-                    fixture_id=bar_fixture.fixture_id,
-                    channel_values=_blue_values_for_fixture(bar_fixture, intensity=128),
-                )
+    # Bar LED always blue dim; every other wash is off except the current target.
+    # FixtureState is frozen, so the shared bar/off states are built only once.
+    leading: list[FixtureState] = []
+    if bar_fixture:
+        leading.append(
+            FixtureState(
+                fixture_id=bar_fixture.fixture_id,
+                channel_values=_blue_values_for_fixture(bar_fixture, intensity=128),
             )
+        )
+    off_states = [
+        FixtureState(fixture_id=fx.fixture_id, channel_values=_off_values_for_fixture(fx))
+        for fx in sweep_targets
+    ]
 
-        # For each wash: only the target is on blue; others off.
-        for fx in sweep_targets:
-            if fx == target:
-                states.append(
-                    FixtureState(
-                        fixture_id=fx.fixture_id,
-                        channel_values=_blue_values_for_fixture(fx, intensity=180),
-                    )
-                )
-            else:
-                states.append(
-                    FixtureState(
-                        fixture_id=fx.fixture_id,
-                        channel_values=_off_values_for_fixture(fx),
-                    )
-                )
+    scenes: list[SceneSpec] = []
+    for position, target in enumerate(sweep_targets or wash_fixtures):
+        states = leading + off_states
+        if sweep_targets:
+            states[len(leading) + position] = FixtureState(
+                fixture_id=target.fixture_id,
+                channel_values=_blue_values_for_fixture(target, intensity=180),
+            )
 
         scenes.append(
             SceneSpec(
@@ -491,44 +650,46 @@ def _build_primary_sweep_scenes(rig: Rig) -> list[SceneSpec]:
 def _blue_values_for_fixture(fixture: FixtureDef, intensity: int) -> dict[str, int]:
     """Return channel map for blue color with optional dimmer."""
 
-    if fixture.channel_count >= 5:
-        return {"ch0": intensity, "ch1": 0, "ch2": 0, "ch3": 255, "ch4": 0}
-    if fixture.channel_count == 4:
-        return {"ch0": intensity, "ch1": 0, "ch2": 0, "ch3": 255}
-    if fixture.channel_count >= 3:
-        return {"ch0": 0, "ch1": 0, "ch2": 255}
-    if fixture.channel_count >= 1:
-        return {"ch0": intensity}
-    return {}
+    return dict(_blue_layout(_channel_tier(fixture.channel_count), intensity))
 
 
 def _off_values_for_fixture(fixture: FixtureDef) -> dict[str, int]:
     """Return channel map to turn a fixture off."""
 
-    if fixture.channel_count >= 5:
-        return {"ch0": 0, "ch1": 0, "ch2": 0, "ch3": 0, "ch4": 0}
-    if fixture.channel_count == 4:
-        return {"ch0": 0, "ch1": 0, "ch2": 0, "ch3": 0}
-    if fixture.channel_count >= 3:
-        return {"ch0": 0, "ch1": 0, "ch2": 0}
-    if fixture.channel_count >= 1:
-        return {"ch0": 0}
-    return {}
-
-
-def _indent(elem: ET.Element, level: int = 0) -> None:
-    """Pretty-print helper to keep the XML readable."""
-
-    indent_str = "\n" + "  " * level
-    if len(elem):
-        if not elem.text or not elem.text.strip():
-            elem.text = indent_str + "  "
-        for child in elem:
-            _indent(child, level + 1)
-            if not child.tail or not child.tail.strip():
-                child.tail = indent_str + "  "
-        if not child.tail or not child.tail.strip():
-            child.tail = indent_str
-    else:
-        if level and (not elem.tail or not elem.tail.strip()):
-            elem.tail = indent_str
+    return dict(_uniform_layout(_channel_tier(fixture.channel_count), 0))
+
+
+def _channel_tier(channel_count: int) -> int:
+    """Collapse a channel count onto the known layouts: 5, 4, 3, 1 or 0 channels."""
+
+    if channel_count >= 5:
+        return 5
+    if channel_count == 4:
+        return 4
+    if channel_count >= 3:
+        return 3
+    return 1 if channel_count >= 1 else 0
+
+
+_LAYOUT_CHANNELS = ("ch0", "ch1", "ch2", "ch3", "ch4")
+
+
+@functools.lru_cache(maxsize=None)
+def _blue_layout(tier: int, intensity: int) -> Tuple[Tuple[str, int], ...]:
+    """Blue (channel, value) pairs per layout: dimmer + RGB(W), plain RGB, or dimmer only."""
+
+    values = {
+        5: (intensity, 0, 0, 255, 0),
+        4: (intensity, 0, 0, 255),
+        3: (0, 0, 255),
+        1: (intensity,),
+        0: (),
+    }[tier]
+    return tuple(zip(_LAYOUT_CHANNELS, values))
+
+
+@functools.lru_cache(maxsize=None)
+def _uniform_layout(tier: int, value: int) -> Tuple[Tuple[str, int], ...]:
+    """(channel, value) pairs setting every channel of the layout to the same value."""
+
+    return tuple((name, value) for name in _LAYOUT_CHANNELS[:tier])
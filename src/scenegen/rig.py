@@ -1,10 +1,12 @@
 """Data models to describe a QLC+ rig."""
 
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
+from .schema import SLOTS
 
-@dataclass
+
+@dataclass(**SLOTS)
 class ChannelDef:
     """Describe a single channel inside a fixture."""
 
@@ -14,7 +16,7 @@ class ChannelDef:
     default_value: Optional[int] = None
 
 
-@dataclass
+@dataclass(**SLOTS)
 class FixtureDef:
     """Describe a fixture within the rig."""
 
@@ -35,7 +37,20 @@ class FixtureDef:
 
 @dataclass
 class Rig:
-    """Data model for a full rig ready for scene generation."""
+    """Data model for a full rig ready for scene generation.
+
+    Treat the fixture list as read-only once the rig is built: derived data such
+    as the prompt fixture block, the channel index maps and the fixtures-by-category
+    index is cached on the instance.
+    """
 
     name: str
     fixtures: List[FixtureDef] = field(default_factory=list)
+    _prompt_block: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _channel_maps: Optional[Dict[str, Dict[str, int]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # (snapshot of the categories it was built from, category -> fixtures, all categorized fixtures)
+    _category_index: Optional[
+        Tuple[Tuple[Tuple[str, Tuple[str, ...]], ...], Dict[str, List[FixtureDef]], List[FixtureDef]]
+    ] = field(default=None, init=False, repr=False, compare=False)
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-import json
+import functools
 import logging
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple, Union
 
+from . import json_compat
 from .rig import FixtureDef, Rig
 from .schema import FixtureState, SceneSpec
 from .scene_selector import SemanticScene
@@ -14,6 +15,8 @@ from .scene_selector import SemanticScene
 logger = logging.getLogger(__name__)
 
 RGB = Tuple[int, int, int]
+# A palette resolved to the colors assigned round-robin to target fixtures.
+PaletteColors = Tuple[RGB, ...]
 
 
 def load_palettes(path: str | Path) -> Dict[str, dict]:
@@ -21,7 +24,7 @@ def load_palettes(path: str | Path) -> Dict[str, dict]:
 
     path = Path(path)
     try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
+        payload = json_compat.load_path(path)
     except Exception as exc:  # noqa: BLE001
         logger.error("Could not read palettes at %s: %s", path, exc)
         return {}
@@ -31,12 +34,28 @@ def load_palettes(path: str | Path) -> Dict[str, dict]:
     return palettes
 
 
+def compile_palettes(palettes: Mapping[str, dict]) -> Dict[str, Union[dict, PaletteColors]]:
+    """Resolve each palette to its round-robin colors once, ahead of scene mapping.
+
+    The result can be passed to `apply_scene` in place of the raw palettes. Malformed
+    palettes are kept as-is so they only fail if a scene actually uses them.
+    """
+
+    compiled: Dict[str, Union[dict, PaletteColors]] = {}
+    for name, palette in palettes.items():
+        try:
+            compiled[name] = _palette_colors(palette)
+        except (AttributeError, LookupError, TypeError, ValueError):
+            compiled[name] = palette
+    return compiled
+
+
 def load_fixture_categories(path: str | Path) -> Dict[str, List[str]]:
     """Load fixture categories and apply aliases for focus."""
 
     path = Path(path)
     try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
+        payload = json_compat.load_path(path)
     except Exception as exc:  # noqa: BLE001
         logger.error("Could not read categories at %s: %s", path, exc)
         return {}
@@ -56,19 +75,28 @@ def load_fixture_categories(path: str | Path) -> Dict[str, List[str]]:
 def apply_scene(
     scene: SemanticScene,
     rig: Rig,
-    palettes: Dict[str, dict],
+    palettes: Mapping[str, Union[dict, PaletteColors]],
     fixture_categories: Dict[str, List[str]],
 ) -> SceneSpec:
-    """Build a SceneSpec from the semantic scene and the rig."""
+    """Build a SceneSpec from the semantic scene and the rig.
+
+    `palettes` may hold raw palette dicts or the output of `compile_palettes`.
+    """
 
-    fixtures_by_category = _index_fixtures_by_category(rig, fixture_categories)
-    targets = _resolve_fixtures_for_focus(scene.focus, fixtures_by_category)
+    fixtures_by_category, all_fixtures = _index_fixtures_by_category(rig, fixture_categories)
+    targets = _resolve_fixtures_for_focus(scene, fixtures_by_category, all_fixtures)
     colors = _colors_for_scene(scene, palettes, len(targets))
 
+    intensity = _intensity_for_energy(scene.energy)
+    # Fixtures with the same channel count and color get identical values; build each once.
+    layouts: dict[tuple[int, RGB], Dict[str, int]] = {}
     states: list[FixtureState] = []
     for idx, fixture in enumerate(targets):
         rgb = colors[idx % len(colors)] if colors else (255, 255, 255)
-        channel_values = _build_channels_for_fixture(fixture, rgb, scene.energy)
+        key = (fixture.channel_count, rgb)
+        channel_values = layouts.get(key)
+        if channel_values is None:
+            channel_values = layouts[key] = _build_channels_for_fixture(key[0], rgb, intensity)
         states.append(FixtureState(fixture_id=fixture.fixture_id, channel_values=channel_values))
 
     description = f"Semantic scene {scene.name} focus={scene.focus} palette={scene.palette} energy={scene.energy}"
@@ -82,89 +110,114 @@ def apply_scene(
 
 def _index_fixtures_by_category(
     rig: Rig, fixture_categories: Dict[str, List[str]]
-) -> Dict[str, List[FixtureDef]]:
-    """Create an index of fixtures by category using the fixture name."""
+) -> Tuple[Dict[str, List[FixtureDef]], List[FixtureDef]]:
+    """Create an index of fixtures by category using the fixture name.
+
+    Returns the index and the concatenation of all its categories (the "mixed"
+    focus). Both are cached on the rig and reused while the categories passed in
+    have the same content, so a batch of scenes builds them only once and edits to
+    the mapping are still picked up.
+    """
+
+    snapshot = tuple((category, tuple(names)) for category, names in fixture_categories.items())
+    cached = rig._category_index
+    if cached is not None and cached[0] == snapshot:
+        return cached[1], cached[2]
 
     name_to_fixture = {fx.name: fx for fx in rig.fixtures}
     indexed: dict[str, list[FixtureDef]] = {}
     for category, names in fixture_categories.items():
         indexed[category] = [name_to_fixture[n] for n in names if n in name_to_fixture]
-    return indexed
+    all_fixtures = [fx for fixtures in indexed.values() for fx in fixtures]
+    rig._category_index = (snapshot, indexed, all_fixtures)
+    return indexed, all_fixtures
 
 
 def _resolve_fixtures_for_focus(
-    focus: str, fixtures_by_category: Dict[str, List[FixtureDef]]
+    scene: SemanticScene,
+    fixtures_by_category: Dict[str, List[FixtureDef]],
+    all_fixtures: List[FixtureDef],
 ) -> List[FixtureDef]:
     """Return the target fixtures according to the focus."""
 
-    focus_lower = focus.lower()
-    if focus_lower == "mixed":
-        targets: list[FixtureDef] = []
-        for lst in fixtures_by_category.values():
-            targets.extend(lst)
-        return targets
+    if scene.focus_lower == "mixed":
+        return all_fixtures
 
-    return fixtures_by_category.get(focus, [])
+    return fixtures_by_category.get(scene.focus, [])
 
 
-def _colors_for_scene(scene: SemanticScene, palettes: Dict[str, dict], count: int) -> List[RGB]:
-    """Resolve a list of RGB colors to assign to target fixtures."""
+def _colors_for_scene(
+    scene: SemanticScene, palettes: Mapping[str, Union[dict, PaletteColors]], count: int
+) -> PaletteColors:
+    """Resolve the RGB colors to assign round-robin to target fixtures."""
 
     if count <= 0:
-        return []
+        return ()
 
     palette = palettes.get(scene.palette, {})
+    if isinstance(palette, tuple):
+        return palette
+    return _palette_colors(palette)
+
+
+def _palette_colors(palette: dict) -> PaletteColors:
+    """Resolve a raw palette dict to the colors cycled over its target fixtures."""
+
     # Split palette: alternate between two colors.
     if "split" in palette:
         left = _tuple_rgb(palette["split"].get("left", (255, 128, 64)))
         right = _tuple_rgb(palette["split"].get("right", (64, 160, 255)))
-        return [left if i % 2 == 0 else right for i in range(count)]
+        return (left, right)
 
     # Rainbow cycle: use the first color for static output.
     if "cycle" in palette:
-        cycle = [_tuple_rgb(c) for c in palette["cycle"]]
-        return cycle or [(255, 255, 255)]
+        cycle = tuple(_tuple_rgb(c) for c in palette["cycle"])
+        return cycle or ((255, 255, 255),)
 
-    rgb = _tuple_rgb(palette.get("rgb", (255, 255, 255)))
-    return [rgb for _ in range(count)]
+    return (_tuple_rgb(palette.get("rgb", (255, 255, 255))),)
 
 
 def _tuple_rgb(value: Sequence[int]) -> RGB:
-    r, g, b = (int(value[0]), int(value[1]), int(value[2]))
+    # Palette colors repeat across scenes; key the clamp on the components so plain
+    # JSON lists can share cached results.
+    return _clamp_rgb(value[0], value[1], value[2])
+
+
+@functools.lru_cache(maxsize=1024)
+def _clamp_rgb(r: int, g: int, b: int) -> RGB:
+    r, g, b = int(r), int(g), int(b)
     return max(0, min(255, r)), max(0, min(255, g)), max(0, min(255, b))
 
 
-def _build_channels_for_fixture(fixture: FixtureDef, rgb: RGB, energy: int) -> Dict[str, int]:
-    """Map color/energy to the fixture 'chN' channels."""
+def _intensity_for_energy(energy: int) -> int:
+    """Map a 1-5 energy level to a DMX intensity (never fully dark)."""
 
-    intensity = max(30, min(255, int(energy / 5 * 255)))
-    r, g, b = rgb
+    return max(30, min(255, int(energy / 5 * 255)))
 
-    # Scale color by intensity when there is no dedicated dimmer.
-    scaled_rgb = (
-        int(r * intensity / 255),
-        int(g * intensity / 255),
-        int(b * intensity / 255),
-    )
 
-    channel_values: dict[str, int] = {}
+def _build_channels_for_fixture(channel_count: int, rgb: RGB, intensity: int) -> Dict[str, int]:
+    """Map color/intensity to the 'chN' channels of a fixture with `channel_count` channels."""
+
+    r, g, b = rgb
+
     # Channels are named ch0, ch1... in rig.py/qlc_io.
-    if fixture.channel_count >= 5:
-        channel_values["ch0"] = intensity  # master dimmer (assumed)
-        channel_values["ch1"] = r
-        channel_values["ch2"] = g
-        channel_values["ch3"] = b
-        channel_values["ch4"] = max(r, g, b)  # optional extra/white
-    elif fixture.channel_count == 4:
-        channel_values["ch0"] = intensity
-        channel_values["ch1"] = r
-        channel_values["ch2"] = g
-        channel_values["ch3"] = max(b, r, g)  # W channel if present
-    elif fixture.channel_count >= 3:
-        channel_values["ch0"] = scaled_rgb[0]
-        channel_values["ch1"] = scaled_rgb[1]
-        channel_values["ch2"] = scaled_rgb[2]
-    elif fixture.channel_count >= 1:
-        channel_values["ch0"] = intensity
-
-    return channel_values
+    if channel_count >= 5:
+        return {
+            "ch0": intensity,  # master dimmer (assumed)
+            "ch1": r,
+            "ch2": g,
+            "ch3": b,
+            "ch4": max(r, g, b),  # optional extra/white
+        }
+    if channel_count == 4:
+        return {"ch0": intensity, "ch1": r, "ch2": g, "ch3": max(b, r, g)}  # W channel if present
+    if channel_count >= 3:
+        # Scale color by intensity when there is no dedicated dimmer.
+        return {
+            "ch0": int(r * intensity / 255),
+            "ch1": int(g * intensity / 255),
+            "ch2": int(b * intensity / 255),
+        }
+    if channel_count >= 1:
+        return {"ch0": intensity}
+    return {}
@@ -2,17 +2,28 @@
 
 from __future__ import annotations
 
-import json
+import bisect
+import functools
 import logging
 import random
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import json_compat
+from .schema import SLOTS
 
 logger = logging.getLogger(__name__)
 
+# Scene focuses suited to drops.
+_DROP_FOCUSES = ("puntuales", "special")
+
+# Catalog keys mapped to SemanticScene fields; anything else goes to `meta`.
+_KNOWN_FIELDS = frozenset({"name", "energy", "palette", "motion", "strobe", "focus"})
+
 
-@dataclass
+@dataclass(**SLOTS)
 class SceneContext:
     """Musical context and recent state used to choose the next scene."""
 
@@ -23,11 +34,24 @@ class SceneContext:
     strobe_allowed: bool = True
     section: Optional[str] = None  # intro/verse/pre/chorus/drop...
     tempo: Optional[float] = None
+    # Source of the weighted draw; None uses the module-level `random` state.
+    rng: Optional[random.Random] = field(default=None, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        # Catalog strings are interned, so interned context strings compare by identity.
+        # Other values (e.g. straight from JSON) are kept as-is and compared normally.
+        if isinstance(self.last_palette, str):
+            self.last_palette = sys.intern(self.last_palette)
+        if isinstance(self.last_scene, str):
+            self.last_scene = sys.intern(self.last_scene)
 
-@dataclass
+
+@dataclass(frozen=True, **SLOTS)
 class SemanticScene:
-    """Semantic scene (not DMX) with the model parameters."""
+    """Semantic scene (not DMX) with the model parameters.
+
+    Scenes are immutable; `focus_lower` is derived from `focus` on construction.
+    """
 
     name: str
     energy: int
@@ -35,100 +59,213 @@ class SemanticScene:
     motion: str
     strobe: str
     focus: str
-    meta: dict | None = None
+    meta: dict | None = field(default=None, hash=False)
+    focus_lower: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "focus_lower", self.focus.lower())
 
     @classmethod
     def from_dict(cls, data: dict) -> "SemanticScene":
+        # Intern the string fields so filter comparisons usually hit the identity fast path.
+        # `meta` stays None unless the entry has keys beyond the known fields.
         return cls(
-            name=str(data.get("name", "unnamed")),
+            name=sys.intern(str(data.get("name", "unnamed"))),
             energy=int(data.get("energy", 1)),
-            palette=str(data.get("palette", "neutral")),
-            motion=str(data.get("motion", "static")),
-            strobe=str(data.get("strobe", "none")),
-            focus=str(data.get("focus", "wash")),
-            meta={k: v for k, v in data.items() if k not in {"name", "energy", "palette", "motion", "strobe", "focus"}},
+            palette=sys.intern(str(data.get("palette", "neutral"))),
+            motion=sys.intern(str(data.get("motion", "static"))),
+            strobe=sys.intern(str(data.get("strobe", "none"))),
+            focus=sys.intern(str(data.get("focus", "wash"))),
+            meta=(
+                None if data.keys() <= _KNOWN_FIELDS else {k: v for k, v in data.items() if k not in _KNOWN_FIELDS}
+            ),
         )
 
 
-def load_scene_catalog(path: str | Path) -> List[SemanticScene]:
+class SceneCatalog(list[SemanticScene]):
+    """List of catalog scenes that caches derived lookups.
+
+    The per-energy candidate windows are built on first use and kept on the
+    instance; every list method that changes the scenes clears them.
+    """
+
+    __slots__ = ("_energy_windows",)
+
+    def __init__(self, scenes: Iterable[SemanticScene] = ()) -> None:
+        super().__init__(scenes)
+        self._energy_windows: Dict[int, List[SemanticScene]] = {}
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Copies and pickles are rebuilt from the scenes with a cache of their own.
+        return type(self), (list(self),)
+
+    def energy_window(self, energy: int) -> List[SemanticScene]:
+        """Return the scenes within +/-1 of `energy`, in catalog order."""
+
+        window = self._energy_windows.get(energy)
+        if window is None:
+            window = self._energy_windows[energy] = [s for s in self if energy - 1 <= s.energy <= energy + 1]
+        return window
+
+
+def _clearing_energy_windows(name: str) -> Callable[..., Any]:
+    """Wrap the list method `name` so it drops the cached energy windows first."""
+
+    method = getattr(list, name)
+
+    @functools.wraps(method)
+    def wrapper(self: SceneCatalog, *args: Any, **kwargs: Any) -> Any:
+        self._energy_windows.clear()
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+):
+    setattr(SceneCatalog, _name, _clearing_energy_windows(_name))
+del _name
+
+
+def load_scene_catalog(path: str | Path) -> SceneCatalog:
     """Load a semantic scene catalog from JSON (root key: 'scenes')."""
 
     path = Path(path)
     try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
+        payload = json_compat.load_path(path)
     except Exception as exc:  # noqa: BLE001
         logger.error("Could not read scene catalog at %s: %s", path, exc)
-        return []
+        return SceneCatalog()
 
     scenes_raw = payload.get("scenes", [])
-    catalog = [SemanticScene.from_dict(item) for item in scenes_raw]
+    catalog = SceneCatalog(SemanticScene.from_dict(item) for item in scenes_raw)
     logger.debug("Catalog loaded from %s with %d scenes", path, len(catalog))
     return catalog
 
 
-def select_scene(context: SceneContext, catalog: Sequence[SemanticScene]) -> Optional[SemanticScene]:
-    """Select a scene by applying the filters defined in the methodology."""
-
-    initial = list(catalog)
-    logger.debug("Start selection with %d scenes in catalog", len(initial))
-
-    candidates = _filter_by_energy(initial, context.energy, delta=1)
-    logger.debug("After energy filter (+/-1) there are %d", len(candidates))
-
-    if context.last_palette:
-        before = len(candidates)
-        candidates = [s for s in candidates if s.palette != context.last_palette]
-        logger.debug("Palette filter (different from %s): %d -> %d", context.last_palette, before, len(candidates))
-
-    if context.last_scene:
-        before = len(candidates)
-        candidates = [s for s in candidates if s.name != context.last_scene]
-        logger.debug("Last-scene filter (%s): %d -> %d", context.last_scene, before, len(candidates))
-
-    if context.energy < 3:
-        before = len(candidates)
-        candidates = [s for s in candidates if s.focus == "wash"]
-        logger.debug("Wash focus filter (energy<3): %d -> %d", before, len(candidates))
+def select_scene(
+    context: SceneContext,
+    catalog: Sequence[SemanticScene],
+    candidate_cache: Optional[Dict[Tuple, List[SemanticScene]]] = None,
+) -> Optional[SemanticScene]:
+    """Select a scene by applying the filters defined in the methodology.
+
+    Filtering is deterministic, so callers selecting repeatedly from the same
+    catalog can pass a dict as `candidate_cache` to reuse the filtered candidates
+    of contexts with identical filter inputs. The weighted draw still runs per call.
+    """
+
+    if candidate_cache is None:
+        candidates = _filter_candidates(context, catalog)
+    else:
+        key = _context_key(context)
+        cached = candidate_cache.get(key)
+        if cached is None:
+            candidates = candidate_cache[key] = _filter_candidates(context, catalog)
+        else:
+            candidates = cached
+
+    return _weighted_choice_by_energy(candidates, context.energy, context.rng)
+
+
+def _context_key(context: SceneContext) -> Tuple:
+    """Return the context fields that affect candidate filtering."""
+
+    return (
+        context.energy,
+        context.last_palette,
+        context.last_scene,
+        context.is_drop,
+        context.strobe_allowed,
+    )
 
-    if context.is_drop:
-        before = len(candidates)
-        candidates = [s for s in candidates if s.focus in ("puntuales", "special")]
-        logger.debug("Drop filter (puntuales/special): %d -> %d", before, len(candidates))
 
-    if not context.strobe_allowed:
-        before = len(candidates)
-        candidates = [s for s in candidates if s.strobe == "none"]
-        logger.debug("Strobe_allowed=False filter: %d -> %d", before, len(candidates))
+def _filter_candidates(context: SceneContext, catalog: Sequence[SemanticScene]) -> List[SemanticScene]:
+    """Apply the methodology filters, relaxing to the whole catalog when nothing matches.
+
+    All filters are evaluated in a single pass over the catalog, short-circuiting on
+    the first one a scene fails. A `SceneCatalog` narrows the pass to its cached
+    energy window first.
+    """
+
+    energy_low, energy_high = context.energy - 1, context.energy + 1
+    last_palette = context.last_palette
+    last_scene = context.last_scene
+    wash_only = context.energy < 3
+    is_drop = context.is_drop
+    strobe_allowed = context.strobe_allowed
+
+    pool = catalog.energy_window(context.energy) if isinstance(catalog, SceneCatalog) else catalog
+    candidates = [
+        s
+        for s in pool
+        if energy_low <= s.energy <= energy_high
+        and (not last_palette or s.palette != last_palette)
+        and (not last_scene or s.name != last_scene)
+        and (not wash_only or s.focus == "wash")
+        and (not is_drop or s.focus in _DROP_FOCUSES)
+        and (strobe_allowed or s.strobe == "none")
+    ]
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Filters (energy %d+/-1, palette!=%s, scene!=%s, wash_only=%s, drop=%s, strobe_allowed=%s): %d -> %d",
+            context.energy,
+            last_palette,
+            last_scene,
+            wash_only,
+            is_drop,
+            strobe_allowed,
+            len(catalog),
+            len(candidates),
+        )
 
     if not candidates:
         logger.warning("No candidates after filters; relaxing energy criterion")
-        candidates = initial
-
-    return _weighted_choice_by_energy(candidates, context.energy)
+        candidates = list(catalog)
 
+    return candidates
 
-def _filter_by_energy(scenes: Iterable[SemanticScene], target: int, delta: int) -> List[SemanticScene]:
-    """Filter scenes whose energy is within [target - delta, target + delta]."""
 
-    return [s for s in scenes if abs(s.energy - target) <= delta]
-
-
-def _weighted_choice_by_energy(candidates: Sequence[SemanticScene], target_energy: int) -> Optional[SemanticScene]:
-    """Choose a scene by weighting closeness to the target energy."""
+def _weighted_choice_by_energy(
+    candidates: Sequence[SemanticScene],
+    target_energy: int,
+    rng: Optional[random.Random] = None,
+) -> Optional[SemanticScene]:
+    """Choose a scene by weighting closeness to the target energy, drawing from `rng` if given."""
 
     if not candidates:
         return None
 
-    weights: list[int] = []
+    # Running sum of the weights; exact energy match weighs more.
+    cum_weights: list[int] = []
+    total = 0
     for scene in candidates:
         diff = abs(scene.energy - target_energy)
-        weights.append(max(1, 3 - diff))  # exact energy match weighs more
-
-    choice = random.choices(candidates, weights=weights, k=1)[0]
-    logger.debug(
-        "Escena seleccionada: %s (energy=%d) con %d candidatos",
-        choice.name,
-        choice.energy,
-        len(candidates),
-    )
+        total += 3 - diff if diff < 2 else 1
+        cum_weights.append(total)
+
+    # Same draw as random.choices(candidates, weights, k=1), without its per-call
+    # accumulate() and result list.
+    draw = (rng or random).random()
+    index = bisect.bisect_right(cum_weights, draw * total, 0, len(candidates) - 1)
+    choice = candidates[index]
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Escena seleccionada: %s (energy=%d) con %d candidatos",
+            choice.name,
+            choice.energy,
+            len(candidates),
+        )
     return choice
@@ -1,20 +1,80 @@
 """Schemas describing generated scenes."""
 
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Mapping, Optional, Sequence, Tuple
 
 SceneType = Literal["static", "chase", "cue"]
 
+# Slotted dataclasses drop the per-instance __dict__; `slots=` needs Python 3.10+.
+SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(init=False, eq=False, frozen=True, **SLOTS)
 class FixtureState:
-    """State of a single fixture for a scene."""
+    """State of a single fixture for a scene.
+
+    Channel values are stored as parallel arrays: channel names and one DMX byte
+    per channel, clamped to 0-255 on construction. States are immutable, so one
+    instance can be shared by several scenes.
+
+    Equality and hashing follow the `channel_values` mapping, so the order channels
+    were given in does not matter. `dataclasses.replace` works, since the parallel
+    arrays are accepted as keywords; `dataclasses.asdict` reports them as stored.
+    """
 
     fixture_id: str
-    channel_values: Dict[str, int] = field(default_factory=dict)
+    channel_names: Tuple[str, ...]
+    values: bytes
 
+    def __init__(
+        self,
+        fixture_id: str,
+        channel_values: Optional[Mapping[str, int]] = None,
+        *,
+        channel_names: Optional[Sequence[str]] = None,
+        values: Optional[bytes] = None,
+    ) -> None:
+        if channel_names is not None or values is not None:
+            # Parallel-array form, as passed back by dataclasses.replace().
+            if channel_values is not None:
+                raise TypeError("Pass either channel_values or channel_names/values, not both")
+            names, data = tuple(channel_names or ()), values or b""
+            if len(names) != len(data):
+                raise ValueError("channel_names and values must have the same length")
+            channel_values = dict(zip(names, data))
+        channel_values = channel_values or {}
+        try:
+            # Fast path: in-range ints convert in C without a per-value Python clamp.
+            values = bytes(channel_values.values())
+        except (TypeError, ValueError):
+            values = bytes(max(0, min(255, int(value))) for value in channel_values.values())
+        # Frozen dataclass: assign through object.__setattr__ during construction.
+        object.__setattr__(self, "fixture_id", fixture_id)
+        # Channel names repeat across states and scenes ("ch0", "red"...); share one copy.
+        object.__setattr__(self, "channel_names", tuple(sys.intern(str(name)) for name in channel_values))
+        object.__setattr__(self, "values", values)
 
-@dataclass
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FixtureState):
+            return NotImplemented
+        if self.fixture_id != other.fixture_id:
+            return False
+        # Channel names are unique, so identical name order lets the bytes compare directly.
+        if self.channel_names == other.channel_names:
+            return self.values == other.values
+        return self.channel_values == other.channel_values
+
+    def __hash__(self) -> int:
+        return hash((self.fixture_id, frozenset(zip(self.channel_names, self.values))))
+
+    @property
+    def channel_values(self) -> Dict[str, int]:
+        """Return the channel values as a name -> value mapping."""
+        return dict(zip(self.channel_names, self.values))
+
+
+@dataclass(**SLOTS)
 class SceneSpec:
     """Specification of a single generated scene."""
 
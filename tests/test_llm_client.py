@@ -0,0 +1,173 @@
+import asyncio
+import json
+import socket
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scenegen.llm_client import LLMClient
+
+
+class _StreamingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    clients: set = set()
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        _StreamingHandler.clients.add(self.client_address)
+        self.rfile.read(int(self.headers["Content-Length"]))
+        chunks = [
+            {"response": '{"title": ', "done": False},
+            {"response": '"Streamed"}', "done": False},
+            {"response": "", "done": True, "eval_count": 2},
+        ]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            line = (json.dumps(chunk) + "\n").encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def test_generate_joins_stream_and_reuses_connection() -> None:
+    _StreamingHandler.clients.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with LLMClient(base_url=f"http://127.0.0.1:{server.server_port}") as client:
+            first = client.generate("prompt")
+            second = client.generate("prompt")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert first["response"] == '{"title": "Streamed"}'
+    assert first["done"] is True
+    assert second == first
+    assert len(_StreamingHandler.clients) == 1, "Keep-alive connection should be reused"
+
+
+def test_agenerate_runs_prompts_concurrently() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    async def _generate_all(client: LLMClient) -> list:
+        return await asyncio.gather(*(client.agenerate(f"prompt {i}") for i in range(3)))
+
+    try:
+        with LLMClient(base_url=f"http://127.0.0.1:{server.server_port}") as client:
+            responses = asyncio.run(_generate_all(client))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert [response["response"] for response in responses] == ['{"title": "Streamed"}'] * 3
+
+
+def test_agenerate_caps_worker_connections() -> None:
+    _StreamingHandler.clients.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    async def _generate_all(client: LLMClient) -> list:
+        return await asyncio.gather(*(client.agenerate(f"prompt {i}") for i in range(6)))
+
+    try:
+        with LLMClient(base_url=f"http://127.0.0.1:{server.server_port}", max_workers=2) as client:
+            responses = asyncio.run(_generate_all(client))
+            idle_workers = len(client._idle_workers)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(responses) == 6
+    assert idle_workers <= 2
+    assert len(_StreamingHandler.clients) <= 2, "At most max_workers connections should be opened"
+
+
+class _BlockingHandler(_StreamingHandler):
+    received = threading.Event()
+    release = threading.Event()
+    disconnected = threading.Event()
+
+    def do_POST(self) -> None:
+        _BlockingHandler.received.set()
+        _BlockingHandler.release.wait(5)
+        super().do_POST()
+
+    def finish(self) -> None:
+        super().finish()
+        _BlockingHandler.disconnected.set()
+
+
+def test_close_while_in_flight_closes_returned_worker() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _BlockingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = LLMClient(base_url=f"http://127.0.0.1:{server.server_port}")
+    result: dict = {}
+    runner = threading.Thread(target=lambda: result.update(asyncio.run(client.agenerate("prompt"))))
+
+    try:
+        runner.start()
+        assert _BlockingHandler.received.wait(5), "Request never reached the server"
+        client.close()
+        _BlockingHandler.release.set()
+        runner.join(5)
+        disconnected = _BlockingHandler.disconnected.wait(5)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert result["response"] == '{"title": "Streamed"}'
+    assert client._idle_workers == []
+    assert disconnected, "Worker returned after close() should drop its connection"
+
+
+class _DroppingHandler(_StreamingHandler):
+    posts = 0
+
+    def do_POST(self) -> None:
+        _DroppingHandler.posts += 1
+        if _DroppingHandler.posts == 1:
+            super().do_POST()
+            return
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        line = (json.dumps({"response": "partial", "done": False}) + "\n").encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+        if _DroppingHandler.posts == 2:
+            # Reset the connection mid-stream instead of closing it cleanly.
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        self.close_connection = True
+
+
+def test_generate_does_not_retry_after_stream_started() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DroppingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with LLMClient(base_url=f"http://127.0.0.1:{server.server_port}") as client:
+            client.generate("prompt")
+            with pytest.raises(RuntimeError):
+                client.generate("prompt")  # connection reset mid-stream
+            with pytest.raises(RuntimeError):
+                client.generate("prompt")  # stream truncated before the final chunk
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert _DroppingHandler.posts == 3, "A partly streamed generation must not be re-sent"
@@ -146,3 +146,123 @@ def test_write_scenes_can_create_flash_chaser(tmp_path: Path) -> None:
     assert shows, "Flash show not found"
     show_funcs = shows[0].findall(".//qlc:ShowFunction", NS)
     assert show_funcs, "ShowFunction for flash chaser missing"
+
+
+def test_write_scenes_keeps_existing_content(tmp_path: Path) -> None:
+    rig = load_rig_from_qlc(str(WORKSPACE_PATH))
+    scene_set = SceneSet(
+        title="Test",
+        scenes=[
+            SceneSpec(
+                name="Spliced",
+                scene_type="static",
+                states=[
+                    FixtureState(
+                        fixture_id=rig.fixtures[0].fixture_id,
+                        channel_values={"ch0": 32},
+                    )
+                ],
+            )
+        ],
+    )
+
+    output = tmp_path / "out_spliced.qxw"
+    write_scenes_to_qlc(str(WORKSPACE_PATH), rig, scene_set, output_path=str(output))
+
+    original = WORKSPACE_PATH.read_bytes()
+    written = output.read_bytes()
+    insert_at = written.index(b'Name="Spliced"')
+    insert_at = written.rindex(b"\n", 0, insert_at) + 1
+    assert written[:insert_at] == original[:insert_at]
+    assert written.endswith(original[insert_at:])
+
+    engine = ET.parse(output).getroot().find("qlc:Engine", NS)
+    tags = [child.tag.split("}")[1] for child in engine]
+    assert tags.index("Monitor") > max(i for i, tag in enumerate(tags) if tag == "Function")
+
+
+def test_write_scenes_fills_self_closing_engine(tmp_path: Path) -> None:
+    rig = load_rig_from_qlc(str(WORKSPACE_PATH))
+    workspace = tmp_path / "empty.qxw"
+    workspace.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<Workspace xmlns="http://www.qlcplus.org/Workspace">\n'
+        " <Engine/>\n"
+        "</Workspace>\n",
+        encoding="utf-8",
+    )
+    scene_set = SceneSet(
+        title="Test",
+        scenes=[
+            SceneSpec(
+                name="First Scene",
+                scene_type="static",
+                states=[
+                    FixtureState(
+                        fixture_id=rig.fixtures[0].fixture_id,
+                        channel_values={"ch0": 255},
+                    )
+                ],
+            )
+        ],
+    )
+
+    output = tmp_path / "out_empty.qxw"
+    write_scenes_to_qlc(str(workspace), rig, scene_set, output_path=str(output), create_show=True)
+
+    root = ET.parse(output).getroot()
+    assert not root.findall("qlc:Function", NS), "Functions must not land outside <Engine>"
+    engine = root.find("qlc:Engine", NS)
+    assert engine is not None
+    functions = engine.findall("qlc:Function", NS)
+    assert [fn.attrib.get("Type") for fn in functions] == ["Scene", "Show"]
+    assert functions[0].attrib.get("ID") == "0"
+
+
+def test_write_scenes_reuses_engine_prefix_and_newlines(tmp_path: Path) -> None:
+    rig = load_rig_from_qlc(str(WORKSPACE_PATH))
+    workspace = tmp_path / "prefixed.qxw"
+    workspace.write_bytes(
+        b'<?xml version="1.0" encoding="UTF-8"?>\r\n'
+        b'<q:Workspace xmlns:q="http://www.qlcplus.org/Workspace">\r\n'
+        b" <q:Engine>\r\n"
+        b'  <q:Function ID="4" Type="Scene" Name="Existing"/>\r\n'
+        b"  <q:Monitor/>\r\n"
+        b" </q:Engine>\r\n"
+        b"</q:Workspace>\r\n"
+    )
+    scene_set = SceneSet(
+        title="Test",
+        scenes=[
+            SceneSpec(
+                name="Prefixed Scene",
+                scene_type="static",
+                states=[
+                    FixtureState(
+                        fixture_id=rig.fixtures[0].fixture_id,
+                        channel_values={"ch0": 10},
+                    )
+                ],
+            )
+        ],
+    )
+
+    output = tmp_path / "out_prefixed.qxw"
+    write_scenes_to_qlc(
+        str(workspace),
+        rig,
+        scene_set,
+        output_path=str(output),
+        create_show=True,
+        create_flash_chaser=True,
+    )
+
+    written = output.read_bytes()
+    assert b"\n" not in written.replace(b"\r\n", b""), "Line endings should follow the workspace"
+    engine = ET.parse(output).getroot().find("qlc:Engine", NS)
+    assert engine is not None
+    functions = engine.findall("qlc:Function", NS)
+    assert functions[0].attrib.get("Name") == "Existing"
+    assert functions[1].attrib.get("ID") == "5"
+    assert {fn.attrib.get("Type") for fn in functions[1:]} == {"Scene", "Show", "Chaser"}
+    assert functions[1].find("qlc:FixtureVal", NS) is not None
@@ -4,8 +4,13 @@ import random
 from scenegen.generator import generate_scenes_for_song
 from scenegen.qlc_io import load_rig_from_qlc
 from scenegen.rig import ChannelDef, FixtureDef, Rig
-from scenegen.scene_mapper import apply_scene, load_fixture_categories, load_palettes
-from scenegen.scene_selector import SceneContext, SemanticScene, select_scene
+from scenegen.scene_mapper import (
+    apply_scene,
+    compile_palettes,
+    load_fixture_categories,
+    load_palettes,
+)
+from scenegen.scene_selector import SceneCatalog, SceneContext, SemanticScene, select_scene
 
 
 BASE_DIR = Path(__file__).resolve().parents[1]
@@ -96,3 +101,122 @@ def test_generator_rule_based_path_returns_scene() -> None:
     )
     assert scene_set.scenes, "Rule-based generation should yield at least one scene"
     assert scene_set.title.startswith("Generated for")
+
+
+def test_scene_context_accepts_non_string_last_values() -> None:
+    catalog = [
+        SemanticScene(name="a", energy=3, palette="warm", motion="static", strobe="none", focus="wash"),
+    ]
+    ctx = SceneContext(energy=3, last_palette=7, last_scene=None)  # type: ignore[arg-type]
+    assert ctx.last_palette == 7
+    chosen = select_scene(ctx, catalog)
+    assert chosen is not None and chosen.name == "a"
+
+
+def test_select_scene_reuses_cached_candidates() -> None:
+    catalog = [
+        SemanticScene(name="a", energy=3, palette="warm", motion="static", strobe="none", focus="wash"),
+        SemanticScene(name="b", energy=3, palette="cool", motion="static", strobe="none", focus="wash"),
+        SemanticScene(name="c", energy=5, palette="cool", motion="static", strobe="none", focus="wash"),
+    ]
+    ctx = SceneContext(energy=3, last_palette="warm")
+    cache: dict = {}
+
+    random.seed(5)
+    uncached = [select_scene(ctx, catalog) for _ in range(5)]
+    random.seed(5)
+    cached = [select_scene(ctx, catalog, candidate_cache=cache) for _ in range(5)]
+
+    assert cached == uncached
+    assert len(cache) == 1
+
+
+def test_compiled_palettes_match_raw_palettes() -> None:
+    palettes = load_palettes(PALETTES_PATH)
+    categories = load_fixture_categories(CATEGORIES_PATH)
+    compiled = compile_palettes(palettes)
+    rig = load_rig_from_qlc(str(WORKSPACE_PATH))
+
+    for name in palettes:
+        scene = SemanticScene(name=name, energy=3, palette=name, motion="static", strobe="none", focus="mixed")
+        raw_spec = apply_scene(scene, rig, palettes=palettes, fixture_categories=categories)
+        compiled_spec = apply_scene(scene, rig, palettes=compiled, fixture_categories=categories)
+        assert compiled_spec == raw_spec
+
+
+def test_compile_palettes_keeps_malformed_unused_palette() -> None:
+    palettes = {
+        "warm": {"rgb": [255, 160, 90]},
+        "object_rgb": {"rgb": {"r": 255, "g": 0, "b": 0}},
+    }
+    compiled = compile_palettes(palettes)
+    assert compiled["object_rgb"] == palettes["object_rgb"]
+
+    categories = load_fixture_categories(CATEGORIES_PATH)
+    rig = load_rig_from_qlc(str(WORKSPACE_PATH))
+    scene = SemanticScene(name="warm", energy=3, palette="warm", motion="static", strobe="none", focus="mixed")
+    spec = apply_scene(scene, rig, palettes=compiled, fixture_categories=categories)
+    assert spec == apply_scene(scene, rig, palettes=palettes, fixture_categories=categories)
+
+
+def test_apply_scene_sees_categories_edited_in_place() -> None:
+    rig = load_rig_from_qlc(str(WORKSPACE_PATH))
+    first, second = rig.fixtures[0], rig.fixtures[1]
+    categories = {"wash": [first.name]}
+    palettes = {"warm": {"rgb": [255, 160, 90]}}
+    scene = SemanticScene(name="w", energy=3, palette="warm", motion="static", strobe="none", focus="wash")
+
+    spec = apply_scene(scene, rig, palettes=palettes, fixture_categories=categories)
+    assert [state.fixture_id for state in spec.states] == [first.fixture_id]
+
+    categories["wash"].append(second.name)
+    spec = apply_scene(scene, rig, palettes=palettes, fixture_categories=categories)
+    assert [state.fixture_id for state in spec.states] == [first.fixture_id, second.fixture_id]
+
+def test_scene_catalog_energy_window_matches_plain_list() -> None:
+    scenes = [
+        SemanticScene(name=f"s{energy}", energy=energy, palette="warm", motion="static", strobe="none", focus="wash")
+        for energy in (1, 5, 3, 2, 4, 3)
+    ]
+    catalog = SceneCatalog(scenes)
+    assert [s.energy for s in catalog.energy_window(3)] == [3, 2, 4, 3]
+    assert catalog.energy_window(3) is catalog.energy_window(3)
+
+    ctx = SceneContext(energy=3, last_palette="cool")
+    random.seed(11)
+    from_list = [select_scene(ctx, scenes) for _ in range(5)]
+    random.seed(11)
+    from_catalog = [select_scene(ctx, catalog) for _ in range(5)]
+    assert from_catalog == from_list
+
+
+def test_scene_catalog_mutation_refreshes_energy_windows() -> None:
+    catalog = SceneCatalog(
+        [SemanticScene(name="a", energy=3, palette="warm", motion="static", strobe="none", focus="wash")]
+    )
+    assert [s.name for s in catalog.energy_window(3)] == ["a"]
+
+    catalog.append(SemanticScene(name="b", energy=4, palette="cool", motion="static", strobe="none", focus="wash"))
+    assert [s.name for s in catalog.energy_window(3)] == ["a", "b"]
+
+    catalog[0] = SemanticScene(name="c", energy=1, palette="warm", motion="static", strobe="none", focus="wash")
+    assert [s.name for s in catalog.energy_window(3)] == ["b"]
+
+    del catalog[:]
+    assert catalog.energy_window(3) == []
+
+
+def test_select_scene_uses_context_rng() -> None:
+    catalog = [
+        SemanticScene(name=f"s{i}", energy=3, palette=f"p{i}", motion="static", strobe="none", focus="wash")
+        for i in range(6)
+    ]
+
+    def _picks(seed: int) -> list:
+        rng = random.Random(seed)
+        return [select_scene(SceneContext(energy=3, rng=rng), catalog).name for _ in range(20)]
+
+    random.seed(0)
+    first = _picks(5)
+    random.seed(1)
+    assert _picks(5) == first, "Seeded context rng should not depend on the global random state"
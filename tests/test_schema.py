@@ -0,0 +1,40 @@
+from dataclasses import asdict, replace
+
+import pytest
+
+from scenegen.schema import FixtureState
+
+
+def test_fixture_state_equality_ignores_channel_order() -> None:
+    first = FixtureState(fixture_id="1", channel_values={"red": 255, "green": 10})
+    second = FixtureState(fixture_id="1", channel_values={"green": 10, "red": 255})
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert first != FixtureState(fixture_id="1", channel_values={"red": 255, "green": 11})
+    assert first != FixtureState(fixture_id="2", channel_values={"red": 255, "green": 10})
+
+
+def test_fixture_state_replace_keeps_channels() -> None:
+    state = FixtureState(fixture_id="1", channel_values={"ch0": 300, "ch1": 7})
+
+    moved = replace(state, fixture_id="2")
+
+    assert moved.fixture_id == "2"
+    assert moved.channel_values == {"ch0": 255, "ch1": 7}
+    assert replace(moved, fixture_id="1") == state
+
+
+def test_fixture_state_parallel_array_constructor() -> None:
+    state = FixtureState(fixture_id="1", channel_names=("ch0", "ch1"), values=b"\x01\x02")
+    assert state == FixtureState(fixture_id="1", channel_values={"ch0": 1, "ch1": 2})
+
+    with pytest.raises(ValueError):
+        FixtureState(fixture_id="1", channel_names=("ch0",), values=b"")
+    with pytest.raises(TypeError):
+        FixtureState(fixture_id="1", channel_values={"ch0": 1}, values=b"\x01")
+
+
+def test_fixture_state_asdict_reports_parallel_arrays() -> None:
+    state = FixtureState(fixture_id="1", channel_values={"ch0": 5})
+    assert asdict(state) == {"fixture_id": "1", "channel_names": ("ch0",), "values": b"\x05"}